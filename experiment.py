@@ -1,7 +1,7 @@
 #     file: experiment.py
 #   author: Jesse Eaton
 #  created: 10/24/2017
-# modified: 10/24/2017
+# modified: 10/18/2026
 #  purpose: runs tusv.py on mulitple patients and validates the results
 
 
@@ -47,6 +47,8 @@ STR_DTYPE = '|S30'
 
 def main(argv):
 	args = get_args(argv)
+	tusv.raiseif(args['sweep_lambda1'] is not None or args['sweep_lambda2'] is not None, 'experiment.py scores one solution per patient. Sweep lambdas with tusv.py or multi_tusv.py instead.')
+	tusv.raiseif(args['sweep_n'] is not None, 'experiment.py scores one solution per patient. Sweep the number of leaves with tusv.py or multi_tusv.py instead.')
 	fm.cp_file_structure_to_out_dir(args['input_directory'], args['output_directory'])
 	subdir_names = fm.get_subdir_names(args['input_directory'])
 	tusv.write_readme(args['output_directory'], args, os.path.basename(__file__))
@@ -56,9 +58,12 @@ def main(argv):
 		in_dir = args['input_directory'] + subdir_name
 		out_dir = args['output_directory'] + subdir_name
 
-		if not os.listdir(out_dir): # empty directory
+		if not tusv.has_output(out_dir): # empty directory or unfinished run
 			pt.printnow('#\n' * 5 + '\nrunning ' + subdir_name + '\n\n' + '#\n' * 5 + '\n')
-			tusv.unmix(in_dir, out_dir, args['num_leaves'], args['c_max'], args['lambda1'], args['lambda2'], args['restart_iters'], args['cord_desc_iters'], args['processors'], args['time_limit'], args['metadata_file'], args['num_subsamples'], args['overide_lambdas'])
+			opts = tusv.get_unmix_opts(args)
+			if opts['warm_start'] is not None: # previous run of the same patient
+				opts['warm_start'] += subdir_name
+			tusv.unmix(in_dir, out_dir, args['num_leaves'], args['c_max'], args['lambda1'], args['lambda2'], args['restart_iters'], args['cord_desc_iters'], args['processors'], args['time_limit'], args['metadata_file'], args['num_subsamples'], args['overide_lambdas'], **opts)
 		else:
 			pt.printnow('#\n' * 5 + '\n\nALREADY RAN ' + subdir_name + '\n\n' + '#\n' * 5 + '\n')
 
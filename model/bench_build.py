@@ -0,0 +1,68 @@
+#     file: bench_build.py
+#  created: 10/18/2026
+# modified: 10/18/2026
+#  purpose: Benchmarks the time to build the model of solver.get_C with each builder in solver.BUILDERS
+#             against the number of nodes N, breakpoints l and segments r. prints a .tsv to stdout
+#    usage: python bench_build.py [num_repeats]
+
+
+# # # # # # # # # # #
+#   I M P O R T S   #
+# # # # # # # # # # #
+
+import sys      # for command line arguments
+import time
+import random
+import numpy as np
+
+# custom modules
+import solver as sv
+import test_solver as ts
+
+
+# # # # # # # # # # # # #
+#   C O N S T A N T S   #
+# # # # # # # # # # # # #
+
+M = 3     # samples
+C_MAX = 7 # maximum copy number
+F_SCALE = 5
+SIZES = [ (n, l, r) for n in [2, 4, 6] for l in [2, 6, 10] for r in [10, 20] ] # (leaves, breakpoints, segments)
+
+
+# # # # # # # # # # # # #
+#   F U N C T I O N S   #
+# # # # # # # # # # # # #
+
+def main(argv):
+	num_repeats = int(argv[0]) if argv else 1
+	random.seed(1)
+	np.random.seed(1)
+	ts.printnow('\t'.join(['N', 'l', 'r', 'builder', 'build_time', 'num_vars', 'num_constrs', 'num_nzs']) + '\n')
+	for n, l, r in SIZES:
+		F, U, Q, G, A, H = gen_instance(n, l, r)
+		for builder in sv.BUILDERS:
+			times = []
+			for _ in xrange(0, num_repeats):
+				t_bgn = time.time()
+				mod, _ = sv._build_C_model(F, U, Q, G, A, H, n, C_MAX, builder)
+				mod.update() # the loop builder leaves pending changes
+				times.append(time.time() - t_bgn)
+			row = [2*n-1, l, r, builder, round(min(times), 4), mod.NumVars, mod.NumConstrs, mod.NumNZs]
+			ts.printnow('\t'.join([ str(x) for x in row ]) + '\n')
+
+# returns F, U, Q, G, A, H of a random instance generated like test_solver does
+def gen_instance(n, l, r):
+	Q = np.array([ np.arange(0, r) == random.randint(0, r-1) for bp in xrange(l) ], dtype = int)
+	F = ts.gen_F(Q, M, l, r, F_SCALE)
+	G = ts.gen_G(l)
+	A = np.random.binomial(100, 0.25, [M, l])
+	H = 100 * np.ones([M, l])
+	return F, ts.gen_U(M, n), Q, G, A, H
+
+#
+#   CALL TO MAIN
+#
+
+if __name__ == "__main__":
+	main(sys.argv[1:])
@@ -0,0 +1,67 @@
+#     file: bench_formulation.py
+#  created: 10/18/2026
+# modified: 10/18/2026
+#  purpose: Benchmarks the build and solve time of solver.get_C for every choice of one selectable part of
+#             the model (see matrix_model.CHOICES) or every backend in solver.BACKENDS on the patients
+#             simulated by sim/sim.py. prints a .tsv to stdout. the size of each patient and the objective of
+#             each backend show which patients can be sent to the open source backend
+#    usage: python bench_formulation.py sim_dir num_leaves c_max part [time_limit] [part=choice ...]
+#             sim_dir is the output folder of sim/sim.py with one subdirectory of .vcf files per patient.
+#             part is a key of matrix_model.CHOICES or backend. every part=choice fixes the choice of
+#             another part, e.g. binarization=bigm with part backend since highs cannot use indicator
+
+
+# # # # # # # # # # #
+#   I M P O R T S   #
+# # # # # # # # # # #
+
+import sys      # for command line arguments
+import os
+import numpy as np
+
+# custom modules
+sys.path.insert(0, '../help/')
+import solver as sv
+import matrix_model as mm
+import file_manager as fm      # gets the patient subdirectories
+import generate_matrices as gm # gets F, Q, G, A, H from .vcf files
+
+
+# # # # # # # # # # # # #
+#   C O N S T A N T S   #
+# # # # # # # # # # # # #
+
+LAMB1 = 0.25 # defaults of tusv.py
+LAMB2 = 6.25
+SEED = 1
+
+
+# # # # # # # # # # # # #
+#   F U N C T I O N S   #
+# # # # # # # # # # # # #
+
+def main(argv):
+	sim_dir, n, c_max, part = os.path.join(argv[0], ''), int(argv[1]), int(argv[2]), argv[3]
+	time_limit = float(argv[4]) if len(argv) > 4 else None
+	fixed = dict([ arg.split('=', 1) for arg in argv[5:] ]) # choice of every other part that is not a default
+	choices = sv.BACKENDS if part == 'backend' else mm.CHOICES[part]
+	cols = ['patient', 'm', 'l', 'r', part, 'build_time', 'opt_time', 'num_vars', 'num_constrs', 'obj_val', 'mip_gap', 'node_count']
+	sv.printnow('\t'.join(cols) + '\n')
+	for patient in sorted(fm.get_subdir_names(sim_dir)):
+		F, Q, G, A, H, _, _ = gm.get_mats(sim_dir + patient)
+		np.random.seed(SEED) # every choice is solved with the same U
+		U = sv.gen_U(len(F), n)
+		for choice in choices:
+			stats = {}
+			formulation = dict(fixed, **{ part: choice })
+			backend = formulation.pop('backend', 'gurobi')
+			sv.get_C(F, U, Q, G, A, H, n, c_max, LAMB1, LAMB2, time_limit, stats = stats, formulation = formulation, backend = backend)
+			row = [ os.path.basename(os.path.normpath(patient)), len(F) ] + list(Q.shape) + [ choice ] + [ stats.get(col) for col in cols[5:] ]
+			sv.printnow('\t'.join([ str(x) for x in row ]) + '\n')
+
+#
+#   CALL TO MAIN
+#
+
+if __name__ == "__main__":
+	main(sys.argv[1:])
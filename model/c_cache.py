@@ -0,0 +1,106 @@
+#     file: c_cache.py
+#  created: 10/18/2026
+# modified: 10/18/2026
+#  purpose: Remembers solutions of solver.get_C so a copy number step whose input was already solved by an
+#             earlier iteration or another random restart is not built and solved again
+
+
+# # # # # # # # # # #
+#   I M P O R T S   #
+# # # # # # # # # # #
+
+import os       # for manipulating files and folders
+import collections
+import numpy as np
+
+# custom modules
+import checkpoint as ck
+import matrix_model as mm
+
+
+# # # # # # # # # # # # #
+#   C O N S T A N T S   #
+# # # # # # # # # # # # #
+
+SOL_FNAME = '%s.npz'
+SOL_NAMES = ['C', 'E', 'R', 'W']
+
+
+# # # # # # # # # # # # #
+#   F U N C T I O N S   #
+# # # # # # # # # # # # #
+
+# solutions of get_C in a least recently used table held in memory and optionally in a directory shared
+#   by every process of a run
+class CCache:
+
+	#  input: max_size (int) number of solutions kept in memory. the least recently used is dropped first
+	#         dname (str or None) directory ending in '/' every solution is also saved to. None keeps
+	#           solutions in memory only
+	#         tol (float) U is rounded to a multiple of tol before it is fingerprinted, so mixtures closer
+	#           than about tol share a solution. 0 only matches identical U
+	#  notes: the cache is copied into each worker process of restarts.run_restarts, so the memory table is
+	#           per process while dname is shared by all of them and kept between runs in the same directory
+	def __init__(self, max_size, dname = None, tol = 0.0):
+		self.max_size = max_size
+		self.dname = dname
+		self.tol = tol
+		self.sols = collections.OrderedDict() # key mapped to (obj_val, C, E, R, W) from least to most recent
+		self.num_hits = 0
+		self.num_misses = 0
+		if dname is not None and not os.path.exists(dname):
+			os.makedirs(dname)
+
+	#  input: same as solver.get_C
+	# output: key (str) hex digest of everything the optimum of get_C depends on
+	#  notes: the backend and most choices of the formulation change how the model is written but not its
+	#           optimum so they are not part of the key. symmetry breaking restricts the trees and is part of
+	#           it. A and H are not used by the model
+	def get_key(self, F, U, Q, G, n, c_max, lamb1, lamb2, weights = None, formulation = None):
+		U_key = np.rint(U / self.tol) if self.tol > 0 else U
+		symmetry = mm.get_formulation(formulation)['symmetry']
+		return ck.get_key((F, Q, G, n, c_max, float(lamb1), float(lamb2), weights, symmetry, U_key))
+
+	# returns obj_val, C, E, R, W saved under key (str). None if key was never saved
+	def get(self, key):
+		sol = self.sols.pop(key, None)
+		if sol is None and self.dname is not None:
+			sol = _load_sol(self._fname(key))
+		if sol is None:
+			self.num_misses += 1
+			return None
+		self.num_hits += 1
+		self._add(key, sol)
+		return sol
+
+	# saves sol (tuple) obj_val, C, E, R, W returned by solver.get_C under key (str)
+	def put(self, key, sol):
+		self.sols.pop(key, None)
+		self._add(key, sol)
+		if self.dname is not None and not os.path.exists(self._fname(key)):
+			_save_sol(self._fname(key), sol)
+
+	def _add(self, key, sol): # adds sol as the most recently used and drops the least recently used
+		if self.max_size <= 0:
+			return
+		self.sols[key] = sol
+		while len(self.sols) > self.max_size:
+			self.sols.popitem(last = False)
+
+	def _fname(self, key):
+		return self.dname + SOL_FNAME % key
+
+def _save_sol(fname, sol):
+	arrs = dict(zip(SOL_NAMES, sol[1:]))
+	arrs['obj_val'] = np.array(sol[0])
+	tmp_fname = fname + '.' + str(os.getpid()) + '.tmp' # other processes may write the same solution
+	with open(tmp_fname, 'wb') as f:
+		np.savez(f, **arrs)
+	os.rename(tmp_fname, fname)
+
+# returns obj_val, C, E, R, W saved by _save_sol. None if fname does not exist
+def _load_sol(fname):
+	if not os.path.exists(fname):
+		return None
+	d = np.load(fname)
+	return tuple([ float(d['obj_val']) ] + [ d[name] for name in SOL_NAMES ])
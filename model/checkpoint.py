@@ -0,0 +1,120 @@
+#     file: checkpoint.py
+#  created: 10/18/2026
+# modified: 10/18/2026
+#  purpose: Saves and loads finished random restarts and cordinate descent iterates so a long run
+#             that was pre-empted can be resumed
+
+
+# # # # # # # # # # #
+#   I M P O R T S   #
+# # # # # # # # # # #
+
+import os       # for manipulating files and folders
+import hashlib  # for fingerprinting the input of a run
+import numpy as np
+
+
+# # # # # # # # # # # # #
+#   C O N S T A N T S   #
+# # # # # # # # # # # # #
+
+KEY_FNAME = 'key.txt'
+RESTART_FNAME = 'restart_%d.npz'
+ITERATE_FNAME = 'restart_%d_iterate.npz'
+RES_NAMES = ['U', 'C', 'E', 'R', 'W']
+
+
+# # # # # # # # # # # # #
+#   F U N C T I O N S   #
+# # # # # # # # # # # # #
+
+#  input: dname (str) checkpoint directory ending in '/'
+#         args (tuple) positional arguments for solver.get_UCE
+#         resume (bool) keep checkpoints already in dname. otherwise they are deleted
+#         settings (tuple) everything else the restarts depend on, such as their inits, the formulation and
+#           the backend. checkpoints are only valid for args and settings
+#  does: creates dname and writes the fingerprint of args and settings to it. raises if resuming a run with
+#          different args or settings
+def setup(dname, args, resume, settings = ()):
+	if not os.path.exists(dname):
+		os.makedirs(dname)
+	key = get_key(tuple(args) + tuple(settings))
+	key_fname = dname + KEY_FNAME
+	if resume and os.path.exists(key_fname):
+		if open(key_fname).read().strip() != key:
+			raise Exception('Checkpoint in ' + dname + ' was written for different input, parameters, starting trees, formulation or backend. Use the same arguments (including --seed if -s is used) or remove the directory.')
+		return
+	for fname in os.listdir(dname): # stale checkpoints from another run
+		if fname.endswith('.npz'):
+			os.remove(dname + fname)
+	_write_atomic(key_fname, lambda f: f.write(key.encode()))
+
+# returns hex digest fingerprinting args (tuple) such as the input matrices and parameters of solver.get_UCE.
+#   arrays are fingerprinted by value and tuples, lists and dicts element by element
+def get_key(args):
+	h = hashlib.sha1()
+	_add_to_key(h, args)
+	return h.hexdigest()
+
+def _add_to_key(h, arg):
+	if isinstance(arg, np.ndarray):
+		h.update(np.ascontiguousarray(arg, dtype = float).tobytes())
+		h.update(str(arg.shape).encode())
+	elif isinstance(arg, (tuple, list)):
+		h.update((type(arg).__name__ + str(len(arg))).encode())
+		for x in arg:
+			_add_to_key(h, x)
+	elif isinstance(arg, dict):
+		_add_to_key(h, sorted(arg.items()))
+	else:
+		h.update(repr(arg).encode())
+
+def restart_fname(dname, i):
+	return dname + RESTART_FNAME % i
+
+def iterate_fname(dname, i):
+	return dname + ITERATE_FNAME % i
+
+#  input: fname (str) file to write
+#         res (tuple) U, C, E, R, W, obj_val, err_msg returned by solver.get_UCE
+#         stats (dict) stats filled by solver.get_UCE
+def save_restart(fname, res, stats):
+	arrs = { 'status': np.array(str(stats.get('status'))), 'iters': np.array(stats.get('iters', 0)) }
+	if res[6] is not None:
+		arrs['err_msg'] = np.array(str(res[6]))
+	else:
+		arrs.update(dict(zip(RES_NAMES, res[:5])))
+		arrs['obj_val'] = np.array(res[5])
+	_write_atomic(fname, lambda f: np.savez(f, **arrs))
+
+# returns res (tuple) and stats (dict) as passed to save_restart. None, None if fname does not exist
+def load_restart(fname):
+	if not os.path.exists(fname):
+		return None, None
+	d = np.load(fname)
+	stats = { 'status': str(d['status']), 'iters': int(d['iters']), 'resumed': True }
+	if 'err_msg' in d.files:
+		return (None, None, None, None, None, None, str(d['err_msg'])), stats
+	return tuple([ d[name] for name in RES_NAMES ] + [ float(d['obj_val']), None ]), stats
+
+#  input: fname (str) file to write
+#         i (int) index of the finished cordinate descent iteration
+#         U, C, E, R, W (np.array) iterate returned by solver.get_U and solver.get_C
+#         obj_val (float) objective value of iterate
+def save_iterate(fname, i, U, C, E, R, W, obj_val):
+	arrs = dict(zip(RES_NAMES, [U, C, E, R, W]))
+	arrs['i'] = np.array(i)
+	arrs['obj_val'] = np.array(obj_val)
+	_write_atomic(fname, lambda f: np.savez(f, **arrs))
+
+# returns i (int) and iterate (tuple) U, C, E, R, W, obj_val as passed to save_iterate
+def load_iterate(fname):
+	d = np.load(fname)
+	return int(d['i']), tuple([ d[name] for name in RES_NAMES ] + [ float(d['obj_val']) ])
+
+# writes to a temporary file first so a pre-empted write never leaves a partial checkpoint
+def _write_atomic(fname, write):
+	tmp_fname = fname + '.tmp'
+	with open(tmp_fname, 'wb') as f:
+		write(f)
+	os.rename(tmp_fname, fname)
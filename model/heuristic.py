@@ -0,0 +1,128 @@
+#     file: heuristic.py
+#  created: 10/18/2026
+# modified: 10/18/2026
+#  purpose: Builds a tree and copy numbers from the mixed copy numbers alone with numpy. they are a feasible
+#             solution of the model of solver.get_C for any U and are given to its first solve as a MIP start
+
+
+# # # # # # # # # # #
+#   I M P O R T S   #
+# # # # # # # # # # #
+
+import numpy as np
+
+# custom modules
+import matrix_model as mm
+
+
+# # # # # # # # # # # # #
+#   C O N S T A N T S   #
+# # # # # # # # # # # # #
+
+MAX_CLUSTER_ITERS = 20 # iterations of k-medians when grouping samples into leaves
+
+
+# # # # # # # # # # # # #
+#   F U N C T I O N S   #
+# # # # # # # # # # # # #
+
+#  input: F (np.array of float) [m, l+r] mixed copy number f_p,s of mutation s in sample p
+#         Q (np.array of 0 or 1) [l, r] q_b,s == 1 if breakpoint b is in segment s. 0 otherwise
+#         G (np.array of 0 or 1) [l, l] g_s,t == 1 if breakpoints s and t are mates. 0 otherwise
+#         n (int) number of leaves in phylogeny. 2n-1 is total number of nodes
+#         c_max (int) maximum allowed copy number for any element in output C
+# output: C (np.array of int) [2n-1, l+r] copy numbers satisfying every constraint of solver.get_C
+#         E (np.array of int) [2n-1, 2n-1] tree with root v_{2n-2}
+#  notes: the samples are grouped into n leaf profiles, the closest profiles (L1 distance) are joined until
+#           the root is reached and the profiles are rounded. each breakpoint appears at the lowest common
+#           ancestor of the leaves it is found in and is never lost below it. that also satisfies the
+#           ancestry condition on Phi, which is the only constraint depending on U
+def get_start(F, Q, G, n, c_max):
+	l, r = Q.shape
+	N = 2*n - 1
+	P = np.zeros((N, l + r))
+	P[:n, :] = _get_leaf_profiles(F, n)
+	E = np.zeros((N, N), dtype = int)
+	_join_profiles(P, E, n)
+	P[N-1, :l], P[N-1, l:] = 0, 2 # root is diploid without breakpoints
+
+	C = np.clip(np.rint(P), 0, c_max).astype(int)
+	C[N-1, l:] = 2
+	tops = E[N-1, :] == 1 # children of the root
+	C[tops, l:] = np.maximum(C[tops, l:], 2 - c_max) # X_cost bounds the change of a segment across an edge by c_max and
+	                                                 #   the root has 2. this only raises 0 to 1 when c_max == 1
+	C[:, :l] = 0
+	parent = np.argmax(E, axis = 0)
+	rep = mm.get_mate_reps(G)
+	for g in np.unique(rep):
+		bps = np.nonzero(rep == g)[0]
+		j = _get_appearance_node(P[:n, bps].mean(axis = 1), parent)
+		below = _get_subtree(E, j)
+		C[np.ix_(below, bps)] = np.maximum(1, C[np.ix_(below, bps)])
+		segs = np.nonzero(Q[bps, :].any(axis = 0))[0] + l
+		C[np.ix_(below, segs)] = np.maximum(1, C[np.ix_(below, segs)]) # segment holds the breakpoint
+	C[:, :l] = np.minimum(C[:, :l], C[:, l:].dot(Q.T)) # breakpoint copy number is at most that of its segment
+	return C, E
+
+#  input: F (np.array of float) [m, l+r] mixed copy numbers
+#         n (int) number of leaves
+# output: P (np.array of float) [n, l+r] center of each group of samples found by k-medians. with fewer than n
+#           samples each sample is a leaf and the last samples are repeated
+#  notes: groups start from the samples farthest from each other so the result does not depend on the seed
+def _get_leaf_profiles(F, n):
+	m = len(F)
+	if m <= n:
+		return F[[ k % m for k in xrange(0, n) ], :]
+	dist = lambda X, Y: np.abs(X[:, None, :] - Y[None, :, :]).sum(axis = 2)
+	centers = [ int(np.argmax(dist(F, F.mean(axis = 0)[None, :]))) ]
+	while len(centers) < n:
+		centers.append(int(np.argmax(dist(F, F[centers]).min(axis = 1))))
+	P = F[centers, :].copy()
+	for _ in xrange(0, MAX_CLUSTER_ITERS):
+		group = np.argmin(dist(F, P), axis = 1)
+		P_new = np.array([ np.median(F[group == k], axis = 0) if (group == k).any() else P[k] for k in xrange(0, n) ])
+		if np.allclose(P_new, P):
+			break
+		P = P_new
+	return P
+
+# joins the two closest nodes without a parent into a new internal node until every node has one. the profile
+#   of v_k in P (np.array of float) [2n-1, l+r] is the mean of its children. fills E (np.array of int) [2n-1, 2n-1]
+def _join_profiles(P, E, n):
+	tops = range(0, n) # nodes without a parent
+	for k in xrange(n, 2*n-1):
+		D = np.abs(P[tops][:, None, :] - P[tops][None, :, :]).sum(axis = 2)
+		D[np.diag_indices(len(tops))] = np.inf
+		a, b = np.unravel_index(np.argmin(D), D.shape)
+		i, j = tops[a], tops[b]
+		E[k, i] = E[k, j] = 1
+		P[k, :] = (P[i, :] + P[j, :]) / 2.0
+		tops = [ t for t in tops if t not in (i, j) ] + [k]
+
+#  input: f (np.array of float) [n] mixed copy number of a breakpoint in each leaf profile
+#         parent (np.array of int) [2n-1] parent of every node. any value for the root
+# output: j (int) lowest common ancestor of the leaves the breakpoint is found in. the child of the root
+#           holding most of them if that is the root, since breakpoints cannot appear at the root
+def _get_appearance_node(f, parent):
+	root = len(parent) - 1
+	leaves = np.nonzero(f >= 0.5)[0] if (f >= 0.5).any() else [ int(np.argmax(f)) ]
+	paths = [ _get_path(k, parent, root) for k in leaves ]
+	common = [ j for j in paths[0] if all([ j in path for path in paths ]) ]
+	if common[0] != root:
+		return common[0]
+	tops = [ path[-2] for path in paths ] # child of the root above each leaf
+	return max(sorted(set(tops)), key = tops.count)
+
+# returns path (list of int) from node k up to and including the root
+def _get_path(k, parent, root):
+	path = [k]
+	while path[-1] != root:
+		path.append(parent[path[-1]])
+	return path
+
+# returns nodes (list of int) in the subtree of tree E (np.array of int) [N, N] rooted at node j
+def _get_subtree(E, j):
+	nodes = [j]
+	for k in nodes:
+		nodes += list(np.nonzero(E[k, :])[0])
+	return nodes
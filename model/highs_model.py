@@ -0,0 +1,107 @@
+#     file: highs_model.py
+#  created: 10/18/2026
+# modified: 10/18/2026
+#  purpose: Solves the copy number model of solver.get_C and the mixture models of solver.get_U with the open
+#             source solver HiGHS through scipy.optimize.milp instead of Gurobi. the variables and rows are
+#             the ones matrix_model builds, so both backends solve the same formulation. needs scipy 1.9 or
+#             newer and no license
+
+
+# # # # # # # # # # #
+#   I M P O R T S   #
+# # # # # # # # # # #
+
+import time     # for timing model solving
+import numpy as np
+import scipy.optimize as so
+
+# custom modules
+import matrix_model as mm
+
+
+# # # # # # # # # # # # #
+#   C O N S T A N T S   #
+# # # # # # # # # # # # #
+
+MIP_GAP = 1e-4 # relative gap HiGHS stops at. the default of Gurobi
+OPTIMAL = 0    # status of scipy.optimize.milp for a solution proven optimal
+
+
+# # # # # # # # # # # # #
+#   F U N C T I O N S   #
+# # # # # # # # # # # # #
+
+#  input: same as matrix_model.build
+# output: mod (dict) the arrays of the model. 'objs' (list of np.array) coefficients of the unmixing error,
+#           tree cost and bpf penalty of every variable. 'layout' (dict) see matrix_model.get_solved
+#  notes: the indicator binarization of matrix_model has no counterpart in HiGHS
+def build_C(F, U, Q, G, Pi, n, c_max, formulation = None, weights = None):
+	V, Rw, Ly, _, objs = mm.build_rows(F, U, Q, G, Pi, n, c_max, formulation, weights)
+	mod = _get_arrays(V, Rw)
+	mod['objs'] = [ _get_coefs(V.num, Y, coefs) for Y, coefs in objs ]
+	mod['layout'] = Ly
+	return mod
+
+#  input: mod (dict) model returned by build_C
+#         lamb1 (float) regularization term to weight total tree cost against unmixing error
+#         lamb2 (float) regularization term to weight breakpoint frequency error
+#         time_limit (float or None) maximum number of seconds HiGHS will run
+#         stats (dict or None) if given, filled with the same statistics as solver._set_solve_stats
+#         build_time (float) seconds spent building mod
+# output: obj_val (float) objective value of solution
+#         C, E, R, W_node (np.array) solution as matrix_model.get_solved returns it
+#  notes: every output is None if no feasible solution was found
+def solve_C(mod, lamb1, lamb2, time_limit = None, stats = None, build_time = 0.0):
+	err, cost, bpf = mod['objs']
+	t_opt = time.time()
+	res = _milp(mod, err + lamb1 * cost + lamb2 * bpf, time_limit)
+	if stats is not None:
+		stats.update({ 'build_time': build_time, 'opt_time': time.time() - t_opt, 'status': res.status,
+		               'num_vars': len(mod['lb']), 'num_constrs': mod['A'].shape[0], 'sol_count': int(res.x is not None),
+		               'obj_val': res.fun if res.x is not None else None, 'mip_gap': getattr(res, 'mip_gap', None),
+		               'node_count': getattr(res, 'mip_node_count', None) })
+	if res.x is None:
+		return None, None, None, None, None
+	return (res.fun,) + mm.get_solved({ 'layout': mod['layout'] }, res.x)
+
+# returns u (np.array of float) [2n-1] mixture of one sample with mixed copy numbers f (np.array of float)
+#   [l+r] given copy numbers C (np.array of int) [2n-1, l+r]. see matrix_model.build_U
+def solve_U(f, C, weights = None):
+	V, Rw, I, (Err, coefs) = mm.build_U_rows(f, C, weights)
+	mod = _get_arrays(V, Rw)
+	res = _milp(mod, _get_coefs(V.num, Err, coefs), None)
+	return res.x[I['U']]
+
+# returns dict with the constraint matrix 'A', its bounds 'lo', 'hi', the variable bounds 'lb', 'ub' and
+#   'integrality' of the variables and rows of V (matrix_model.Vars) and Rw (matrix_model.Rows)
+def _get_arrays(V, Rw):
+	if Rw.indicators:
+		raise Exception('The indicator binarization needs the gurobi backend. Use bits or bigm with highs.')
+	lb, ub, vtypes = V.get_bounds()
+	M, senses, rhs = Rw.get_matrix()
+	return {
+		'A': M,
+		'lo': np.where(senses == mm.LE, -np.inf, rhs),
+		'hi': np.where(senses == mm.GE, np.inf, rhs),
+		'lb': lb,
+		'ub': np.where(vtypes == mm.BIN, np.minimum(ub, 1.0), np.where(ub >= mm.INF, np.inf, ub)), # Gurobi bounds binaries itself
+		'integrality': (vtypes != mm.CNT).astype(int)
+	}
+
+# returns coefficient (np.array of float) [num_vars] of each variable in the sum of the variables in index
+#   array Y times coefs (float or np.array broadcast against Y)
+def _get_coefs(num_vars, Y, coefs):
+	is_var = Y >= 0
+	c = np.zeros(num_vars)
+	np.add.at(c, Y[is_var], np.broadcast_to(np.asarray(coefs, dtype = float), Y.shape)[is_var])
+	return c
+
+# returns scipy.optimize.OptimizeResult of minimizing c (np.array of float) over mod (dict) with HiGHS
+def _milp(mod, c, time_limit):
+	if not hasattr(so, 'milp'):
+		raise Exception('The highs backend needs scipy 1.9 or newer.')
+	options = { 'disp': False, 'mip_rel_gap': MIP_GAP }
+	if time_limit is not None:
+		options['time_limit'] = float(time_limit)
+	return so.milp(c, integrality = mod['integrality'], bounds = so.Bounds(mod['lb'], mod['ub']),
+	               constraints = so.LinearConstraint(mod['A'], mod['lo'], mod['hi']), options = options)
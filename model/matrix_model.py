@@ -0,0 +1,681 @@
+#     file: matrix_model.py
+#  created: 10/18/2026
+# modified: 10/18/2026
+#  purpose: Builds the copy number model of solver.get_C and the mixture models of solver.get_U with the
+#             gurobipy matrix API. every variable lives in one MVar and every constraint family is assembled
+#             as a sparse matrix with numpy instead of one addVar and addConstr call at a time. needs
+#             gurobipy 9.1 or newer
+
+
+# # # # # # # # # # #
+#   I M P O R T S   #
+# # # # # # # # # # #
+
+import math     # it's math. we're gonna need it
+import numpy as np
+import scipy.sparse as sps
+
+gp = None # gurobipy. only imported by import_gurobi once a Gurobi model is built so HiGHS runs without it
+
+
+# # # # # # # # # # # # #
+#   C O N S T A N T S   #
+# # # # # # # # # # # # #
+
+BIN = 'B'      # variable types and constraint senses. the same codes as gurobipy.GRB
+INT = 'I'
+CNT = 'C'
+EQ = '='
+LE = '<'
+GE = '>'
+INF = 1e100    # gurobipy.GRB.INFINITY
+ZERO = -1      # index of the constant 0 in an index array. see Vars
+ANCESTRY = ['triples', 'flow']         # encodings of the ancestry matrix A. see build
+ORDERING = ['blocks', 'precedence']    # encodings of the breakpoint order condition on Phi. see build
+BINARIZATION = ['bits', 'bigm', 'indicator'] # encodings of the nonzero flag of an integer. see _add_bin_rep
+SYMMETRY = ['none', 'order']           # symmetry breaking of the node labels. see _add_symmetry_constraints
+FORMULATION = { 'ancestry': 'triples', 'ordering': 'blocks', 'binarization': 'bits', 'symmetry': 'none' } # default choice of every selectable part of the model
+CHOICES = { 'ancestry': ANCESTRY, 'ordering': ORDERING, 'binarization': BINARIZATION, 'symmetry': SYMMETRY } # every choice of each selectable part
+ABS_TOL = 1e-6 # values this close above an integer are rounded down by get_start. well within Gurobi's feasibility tolerance
+
+
+# # # # # # # # # # # # #
+#   F U N C T I O N S   #
+# # # # # # # # # # # # #
+
+#  input: F (np.array of float) [m, l+r] mixed copy number f_p,s of mutation s in sample p
+#         U (np.array of float) [m, 2n-1] 0 <= u_p,k <= 1. percent of sample p made by clone k
+#         Q (np.array of 0 or 1) [l, r] q_b,s == 1 if breakpoint b is in segment s. 0 otherwise
+#         G (np.array of 0 or 1) [l, l] g_s,t == 1 if breakpoints s and t are mates. 0 otherwise
+#         Pi (np.array of float) [m, l] expected bpf of breakpoint b in sample p
+#         n (int) number of leaves in phylogeny. 2n-1 is total number of nodes
+#         c_max (int) maximum allowed copy number for any element in output C
+#         formulation (dict or None) choices overriding FORMULATION. 'ancestry' is one of ANCESTRY.
+#           'triples' propagates A through E with two rows for every triple of nodes. 'flow' sends one unit
+#           of flow from the root to every node along E and reads A off the flow, using O(N^2) rows.
+#           'ordering' is one of ORDERING. 'blocks' makes an l x l integer block for every pair of nodes.
+#           'precedence' makes one binary for every pair of breakpoints, using O(N^2 l + N l^2) rows.
+#           'binarization' is one of BINARIZATION. see _add_bin_rep
+#           'symmetry' is one of SYMMETRY. 'order' only allows trees labeled as get_canonical_order labels
+#           them, which removes the edges from internal nodes to internal nodes with larger indices. since U
+#           is fixed this is a restriction of the model. solver.get_UCE only uses it for the first get_C of a
+#           restart, whose U is random and not yet fit to the labels of any tree
+#         weights (np.array of int or None) [l+r] number of columns each column of F stands for. the unmixing
+#           error and tree cost of a column count this many times. None counts every column once
+# output: mod (gp.Model) model of the same problem as solver._build_C_model_loop but no objective
+#         V (dict) 'obj_terms' (tuple of gp.LinExpr) unmixing error, tree cost and bpf penalty, 'U_rows'
+#           everything set_U needs to change U and 'layout' the index of every variable family. see get_solved
+#  notes: constraint families are added in the same order as the loop builder. variables are only made for
+#           edges (i, j) that can exist (see _get_edge_mask) and the copy numbers of the root are constants.
+#           constraints left without variables are dropped. the loop builder keeps all of them and also
+#           creates an unused binary for every element of the bp appearance indicator
+def build(F, U, Q, G, Pi, n, c_max, formulation = None, weights = None):
+	import_gurobi()
+	V, Rw, Ly, U_rows, objs = build_rows(F, U, Q, G, Pi, n, c_max, formulation, weights)
+	mod = gp.Model('tusv')
+	x = V.create(mod)
+	constrs = Rw.create(mod, x)
+	mod.update()
+
+	X = np.empty(V.num, dtype = object)
+	X[:] = x.tolist()
+	U_rows.update({ 'vars': X, 'constrs': constrs.tolist(), 'rhs': Rw.get_base_rhs(), 'consts': V.get_consts() })
+	Ly['x'] = x
+	obj_terms = tuple([ _get_sum(X, Y, coefs) for Y, coefs in objs ])
+	return mod, { 'obj_terms': obj_terms, 'U_rows': U_rows, 'layout': Ly }
+
+# returns gurobipy and makes it gp of this module. it is imported on first use so that the highs backend, which
+#   only uses build_rows and build_U_rows, runs where gurobipy is not installed
+def import_gurobi():
+	global gp
+	if gp is None:
+		import gurobipy
+		gp = gurobipy
+	return gp
+
+# returns V (Vars) and Rw (Rows) of every variable and constraint of the model of build without making a
+#   model of any solver. also returns Ly (dict) index of every variable family, U_rows (dict) what set_U
+#   needs and objs (list of tuple) index array and coefficients of the unmixing error, tree cost and bpf penalty
+def build_rows(F, U, Q, G, Pi, n, c_max, formulation = None, weights = None):
+	form = get_formulation(formulation)
+	l, r = Q.shape
+	m, L = F.shape
+	weights = np.ones(L, dtype = int) if weights is None else np.asarray(weights)
+	N = 2*n - 1
+	V = Vars()
+	Rw = Rows(V)
+	Ly = { 'F': F, 'Q': Q, 'weights': weights } # index of every variable family. see get_start
+	K = np.arange(N)
+	is_edge = _get_edge_mask(n, form['symmetry'] == 'order')
+
+	C = V.add((N, L), INT, ub = c_max, mask = (K < N-1)[:, None])
+	C[N-1, l:] = V.const(np.full(r, 2))                           # bp has copy number 0 and seg has copy number 2 at root
+	E = V.add((N, N), BIN, mask = is_edge)
+	A = V.add((N, N), BIN, mask = is_edge & (K < N-1)[:, None])  # ancestry matrix
+	A[N-1, :N-1] = V.const(np.ones(N-1))                         # root v_{N-1} is ancestor to all nodes
+	R = V.add((N, N), INT, ub = c_max * weights[l:].sum(), mask = is_edge) # rho. cost across each edge
+	S = V.add((m, l), CNT, ub = c_max)                            # ess. bpf penalty for each bp in each sample
+	rep = get_mate_reps(G)                                        # mates share one set of bp appearance variables
+	W = V.add((N, N, l), BIN, mask = is_edge[:, :, None] & (rep == np.arange(l)))[:, :, rep]
+	C_bin, Ly['C_bin'] = _add_bin_rep(V, Rw, C, c_max, form['binarization'])
+	Gam = V.add((N, l), INT, ub = c_max, mask = (K < N-1)[:, None])
+	Gam[N-1, :] = V.const(2 * Q.sum(axis = 1))                    # segments have copy number 2 at root
+	Ly.update({ 'C': C, 'E': E, 'A': A, 'R': R, 'S': S, 'W': W, 'Gam': Gam })
+
+	if form['symmetry'] == 'order':
+		_add_symmetry_constraints(Rw, E, n)
+	else:
+		_add_tree_constraints(Rw, E, n)
+	if form['ancestry'] == 'flow':
+		_add_ancestry_flow_constraints(V, Rw, A, E, n, Ly)
+	else:
+		_add_ancestry_constraints(Rw, A, E, N)
+	_add_cost_constraints(V, Rw, R, C, E, weights[l:], n, l, r, c_max, Ly)
+	_add_bp_appearance_constraints(V, Rw, C_bin, W, E, rep, n, l, Ly, form['binarization'])
+	U_rows = { 'C': C, 'C_bin': C_bin, 'Gam': Gam, 'Pi': Pi, 'l': l }
+	U_rows['phi'] = _add_ancestry_condition_constraints(V, Rw, C_bin, A, W, U, rep, m, N, l, Ly, form)
+	_add_segment_copy_num_constraints(Rw, Gam, C, Q, W, l)
+	Ly['S_abs'], U_rows['bpf'] = _add_bpf_penalty(V, Rw, S, Pi, U, C, Gam, l)
+	Ly['Err'], U_rows['err'] = _add_abs(V, Rw, (m, L), _get_err_terms(U, U_rows), F) # |f_p,s - f_hat_p,s|
+	Ly['consts'], Ly['num_vars'] = V.get_consts(), V.num
+	return V, Rw, Ly, U_rows, [ (Ly['Err'], weights[None, :]), (R, 1.0), (S, 1.0) ]
+
+# returns gp.LinExpr of the sum of the variables X (np.array of gp.Var) in index array Y times coefs (float or
+#   np.array broadcast against Y)
+def _get_sum(X, Y, coefs):
+	is_var = Y >= 0
+	return gp.LinExpr(np.broadcast_to(np.asarray(coefs, dtype = float), Y.shape)[is_var].tolist(), X[Y[is_var]].tolist())
+
+# returns formulation (dict) FORMULATION with the choices in formulation (dict or None)
+def get_formulation(formulation = None):
+	form = dict(FORMULATION)
+	form.update(formulation or {})
+	return form
+
+#  input: mod (gp.Model) model built by build
+#         V (dict) variables of mod returned by build
+#         U (np.array of float) [m, 2n-1] new mixture to use in mod
+#  notes: only the coefficients multiplying U change. these are in the definition of Phi, the bpf penalty
+#           and the unmixing error. the rest of the model, including Gurobi's internal state, is kept
+def set_U(mod, V, U):
+	I = V['U_rows']
+	families = [ (I['phi'], _neg(_get_phi_terms(U, I))) ]
+	for rows, terms in [ (I['bpf'], _get_bpf_terms(U, I)), (I['err'], _get_err_terms(U, I)) ]:
+		families += [ (rows[0], _neg(terms)), (rows[1], terms) ] # both sides of the absolute value
+	_set_coeffs(mod, I, families)
+
+#  input: f (np.array of float) [l+r] mixed copy number f_s of mutation s in one sample
+#         C (np.array of int) [2n-1, l+r] int copy number c_k,s of mutation s in clone k
+#         env (gp.Env) environment of the model. a model may only be optimized by one thread per environment
+#         weights (np.array of int or None) [l+r] number of columns each column stands for. see build
+# output: mod (gp.Model) model of the row of U of the sample. minimizes the unmixing error of the sample
+#         I (dict) everything solved_U and set_C need
+#  notes: the objective of solver.get_U is a sum over samples, so U is found by solving one of these per sample
+def build_U(f, C, env, weights = None):
+	import_gurobi()
+	V, Rw, I, obj = build_U_rows(f, C, weights)
+	mod = gp.Model('tusv', env = env)
+	x = V.create(mod)
+	constrs = Rw.create(mod, x)
+	X = np.empty(V.num, dtype = object)
+	X[:] = x.tolist()
+	mod.setObjective(_get_sum(X, *obj), gp.GRB.MINIMIZE)
+	mod.update()
+	I.update({ 'x': x, 'vars': X, 'constrs': constrs.tolist(), 'rhs': Rw.get_base_rhs(), 'consts': V.get_consts() })
+	return mod, I
+
+# returns V (Vars), Rw (Rows), I (dict) with index array 'U' and the 'rows' of the error of the model of build_U
+#   without making a model of any solver. also returns obj (tuple) index array and coefficients of the error
+def build_U_rows(f, C, weights = None):
+	N, L = C.shape
+	V = Vars()
+	Rw = Rows(V)
+	U = V.add((N,), CNT, ub = 1.0)
+	Rw.add((1,), [ (1, U[None, :]) ], EQ, 1) # mixture sums to 1
+	I = { 'U': U }
+	Err, I['rows'] = _add_abs(V, Rw, (L,), _get_f_hat_err_terms(C, U), f) # |f_s - f_hat_s|
+	return V, Rw, I, (Err, 1.0 if weights is None else weights)
+
+#  input: V (dict) variables of a model returned by build. only 'layout' and 'U_rows' are used, so they can
+#           also be those returned by build_rows
+#         C (np.array of int) [2n-1, l+r] copy numbers to start from
+#         E (np.array of 0 or 1) [2n-1, 2n-1] tree to start from
+#         U (np.array of float) [m, 2n-1] mixture the model currently uses
+# output: x0 (np.array of float) value of every variable of the model
+#  notes: every auxiliary variable is derived from C, E and U the way the constraints define it. integer
+#           absolute values are rounded up. if C and E are a valid tree the start is a feasible solution
+def get_start(V, C, E, U):
+	Ly, I = V['layout'], V['U_rows']
+	l = I['l']
+	x0 = np.zeros(Ly['num_vars'])
+	C, E = np.rint(C).astype(int), np.rint(E).astype(int)
+	A = _get_ancestry(E)
+	C_bin, C_seg = (C > 0).astype(int), C[:, l:]
+	C_bp = C_bin[:, :l]
+
+	X_cost_abs = np.abs(C_seg[:, None, :] - C_seg[None, :, :])
+	X_cost = E[:, :, None] * X_cost_abs
+	X_bp = 2 + C_bp[:, None, :] - C_bp[None, :, :] - E[:, :, None]
+	W = (X_bp == 0).astype(int)
+	W_node = W.sum(axis = 0)
+	X_anc = A[:, :, None] * C_bp[None, :, :]
+	Y = A.sum(axis = 1)[:, None] - X_anc.sum(axis = 1)
+	Gam = C_seg.dot(Ly['Q'].T)
+	S_abs = _ceil_abs(I['Pi'] * U.dot(Gam) - U.dot(C[:, :l]))
+
+	for X, val in [ ('C', C), ('E', E), ('A', A), ('R', X_cost.dot(Ly['weights'][l:])), ('S', S_abs), ('W', W), ('Gam', Gam), ('X_cost', X_cost),
+	                ('X_cost_abs', X_cost_abs), ('X_bp', X_bp), ('W_node', W_node),
+	                ('X_anc', X_anc), ('Y', Y), ('Phi', U.dot(C_bp)), ('S_abs', S_abs), ('Err', _ceil_abs(Ly['F'] - U.dot(C))) ]:
+		_put(x0, Ly[X], val)
+	bins = [ ('C_bin', C), ('X_bp_bin', X_bp), ('Y_bin', Y) ]
+	if 'Z' in Ly:
+		Z = 3 - W_node[:, None, :, None] - W_node[None, :, None, :] - A[:, :, None, None] + (Y > 0)[:, None, :, None]
+		_put(x0, Ly['Z'], Z)
+		bins.append(('Z_bin', Z))
+	if 'P' in Ly: # s precedes t if s appears at v_i, is never lost below v_i and t appears below v_i
+		D = (A.dot(W_node) > 0).astype(int)
+		_put(x0, Ly['D'], D)
+		_put(x0, Ly['P'], np.einsum('is,it->st', W_node * (Y == 0), D) > 0)
+	if 'Flow' in Ly: # edge (i, k) carries the flow to j if k is j or an ancestor of j
+		_put(x0, Ly['Flow'], E[None, :, :] * (np.identity(len(E), dtype = int) + A.T)[:, None, :])
+	for X, val in bins:
+		Y_bin, Z_bits = Ly[X]
+		_put(x0, Y_bin, val != 0)
+		_put(x0, Z_bits, (val[..., None] >> np.arange(Z_bits.shape[-1])) & 1)
+	return x0
+
+#  input: V (dict) variables of a solved model returned by build
+#         x (np.array of float or None) value of every variable. None reads the solution of the Gurobi model
+# output: C (np.array of float) [2n-1, l+r] copy numbers
+#         E (np.array of float) [2n-1, 2n-1] tree
+#         R (np.array of float) [2n-1, 2n-1] cost of each edge
+#         W_node (np.array of int) [2n-1, l] W_node[j, b] == 1 iff breakpoint b appears at node v_j
+#  notes: constants take their value and variables that were never created are 0
+def get_solved(V, x = None):
+	Ly = V['layout']
+	x = Ly['x'].X if x is None else x
+	C, E, R, W = [ _get_vals(x, Ly[X], Ly['consts']) for X in ['C', 'E', 'R', 'W'] ]
+	return C, E, R, np.rint(W).astype(int).sum(axis = 0)
+
+#  input: mod (gp.Model) model built by build
+#         V (dict) variables of mod returned by build
+#         C, E, U (np.array) see get_start. None clears the start
+#  notes: the start only applies to the next optimize as long as it is not cleared
+def set_start(mod, V, C = None, E = None, U = None):
+	X = V['U_rows']['vars']
+	x0 = get_start(V, C, E, U) if C is not None else np.full(len(X), gp.GRB.UNDEFINED)
+	mod.setAttr(gp.GRB.Attr.Start, X.tolist(), x0.tolist())
+
+# returns S, T (np.array of int) breakpoint s of each pair of mates (s, t) in G (np.array of 0 or 1) [l, l]
+#   with s < t and its mate t
+def get_mates(G):
+	return np.nonzero(np.triu(G, 1))
+
+# returns rep (np.array of int) [l] smallest breakpoint of the group of mates in G (np.array of 0 or 1) [l, l]
+#   each breakpoint b is in. rep[b] == b if b has no mate
+def get_mate_reps(G):
+	rep = np.arange(len(G))
+	for s, t in zip(*get_mates(G)):
+		a, b = rep[s], rep[t]
+		rep[(rep == a) | (rep == b)] = min(a, b)
+	return rep
+
+# returns mask (np.array of bool) [2n-1, 2n-1] of edges (i, j) that can be in the tree. i is not a leaf, j is not
+#   the root and i != j. every other edge is fixed to 0 by the tree constraints of the loop builder. if ordered
+#   (bool) internal nodes also only have internal children with smaller indices
+def _get_edge_mask(n, ordered = False):
+	N = 2*n-1
+	K = np.arange(N)
+	is_edge = (K[:, None] >= n) & (K[None, :] < N-1) & (K[:, None] != K[None, :])
+	if ordered:
+		is_edge &= (K[None, :] < n) | (K[None, :] < K[:, None])
+	return is_edge
+
+#  input: E (np.array of 0 or 1) [2n-1, 2n-1] tree with root v_{2n-2}
+#         n (int) number of leaves
+# output: order (np.array of int) [2n-1] node of E given each index so E[order][:, order] is allowed by the model
+#           with symmetry 'order'. relabel C and the columns of U with it as well
+#  notes: internal nodes are numbered down from the root in breadth first order so every parent has a larger
+#           index than its children and parents are in the same order as their children. leaves are sorted by
+#           the new index of their parent
+def get_canonical_order(E, n):
+	N = 2*n-1
+	E = np.rint(E).astype(int)
+	internal = [N-1] # internal nodes in breadth first order
+	for k in internal:
+		internal += [ j for j in np.nonzero(E[k, :])[0] if j >= n ]
+	new = np.zeros(N, dtype = int) # new index of each node
+	new[internal] = np.arange(N-1, N-1 - len(internal), -1)
+	parent = np.argmax(E, axis = 0)
+	leaves = sorted(xrange(0, n), key = lambda k: new[parent[k]])
+	new[leaves] = np.arange(0, n)
+	return np.argsort(new)
+
+# sets x0[X] (np.array of float) to val (np.array) for the elements of X (np.array of int) that are variables
+def _put(x0, X, val):
+	is_var = X >= 0
+	x0[X[is_var]] = np.broadcast_to(val, X.shape)[is_var]
+
+# returns values (np.array of float) of X (np.array of int) given the values x of all variables and consts
+#   of all constants (np.array of float)
+def _get_vals(x, X, consts):
+	return np.where(X >= 0, x[np.maximum(X, 0)], consts[np.maximum(-1 - X, 0)])
+
+# returns ancestry matrix (np.array of 0 or 1) [N, N] of tree E (np.array of 0 or 1) [N, N]. 1 if i is an ancestor of j
+def _get_ancestry(E):
+	N = len(E)
+	A, paths = np.zeros((N, N), dtype = int), E
+	for _ in xrange(0, N):
+		A |= paths
+		paths = np.minimum(paths.dot(E), 1) # nodes one edge further down
+	return A
+
+# returns smallest integers (np.array of float) that are at least the absolute value of X (np.array of float)
+def _ceil_abs(X):
+	return np.ceil(np.abs(X) - ABS_TOL)
+
+# changes the copy numbers C (np.array of int) [2n-1, l+r] of model mod built by build_U with I (dict)
+def set_C(mod, I, C):
+	terms = _get_f_hat_err_terms(C, I['U'])
+	_set_coeffs(mod, I, [ (I['rows'][0], _neg(terms)), (I['rows'][1], terms) ])
+
+# returns solved row of U (np.array of float) [2n-1] of model built by build_U with I (dict)
+def solved_U(I):
+	return I['x'].X[I['U']]
+
+
+# # # # # # # # # # # # # # # # # # # # # #
+#   G U R O B I   C O N S T R A I N T S   #
+# # # # # # # # # # # # # # # # # # # # # #
+
+# leaves have no outgoing edges, the root has no incoming edge and there are no self edges since E has no
+#   variables for those edges
+def _add_tree_constraints(Rw, E, n):
+	N = 2*n-1
+	I = np.arange(n, N-1)
+	Rw.add((N-n,), [ (1, E[n:, :]) ], EQ, 2)                                # internal nodes have 2 outgoing edges
+	Rw.add((N-1,), [ (1, E[n:, :N-1].T) ], EQ, 1)                           # non root nodes have 1 incoming edge
+	E_I = E[I[:, None], I[None, :]]
+	Rw.add(E_I.shape, [ (1, E_I), (1, E_I.T) ], LE, 1, I[:, None] < I[None, :]) # no 2 node cycles
+
+# tree constraints of _add_tree_constraints for the edges of _get_edge_mask with ordered set. no cycles are
+#   possible since every edge between internal nodes goes to a smaller index. the parent index sum_i i*e_i,j
+#   does not decrease from v_j to v_{j+1}, among the leaves and among the internal nodes. every tree has a
+#   labeling meeting these rows. see get_canonical_order
+def _add_symmetry_constraints(Rw, E, n):
+	N = 2*n-1
+	Rw.add((N-n,), [ (1, E[n:, :]) ], EQ, 2)      # internal nodes have 2 outgoing edges
+	Rw.add((N-1,), [ (1, E[n:, :N-1].T) ], EQ, 1) # non root nodes have 1 incoming edge
+	K = np.arange(N)
+	E_par = E[:, :N-1].T # axes are j, i
+	Rw.add((N-2,), [ (K, E_par[1:]), (-K, E_par[:-1]) ], GE, 0, K[:N-2] != n-1) # v_{n-1} is the last leaf
+
+# the root is ancestor to all nodes and has no ancestors since those entries of A are constants
+def _add_ancestry_constraints(Rw, A, E, N):
+	Rw.add((N, N), [ (1, A), (-1, E) ], GE, 0)   # ancestor if parent
+	K = np.arange(N)
+	is_edge = E[:, :, None] != ZERO
+	keep = (K[:, None, None] != K[None, None, :]) & is_edge & (A >= 0).any(axis = 1)[None, None, :] # axes are i, j, g. others always hold
+	A_gj, A_gi, E_ij = A.T[None, :, :], A.T[:, None, :], E[:, :, None]
+	Rw.add((N, N, N), [ (1, A_gj), (-1, E_ij), (-1, A_gi) ], GE, -1, keep) # v_j gets v_i's ancestor profile except a_{i,j}
+	Rw.add((N, N, N), [ (1, A_gj), (1, E_ij), (-1, A_gi) ], LE, 1, keep)
+
+# Flow[j, i, k] is the flow to v_j across edge (i, k). with one incoming edge per node the flow follows the
+#   only path from the root, so v_i is an ancestor of v_j iff flow to v_j enters v_i. nodes the root cannot
+#   reach get no flow, which also rules out cycles
+def _add_ancestry_flow_constraints(V, Rw, A, E, n, Ly):
+	N = 2*n-1
+	K = np.arange(N)
+	is_dest = (K < N-1)[:, None, None]                                                  # axes are j, i, k
+	on_path = (K[None, None, :] == K[:, None, None]) | (K[None, None, :] >= n)          # only v_j and internal nodes lead to v_j
+	Flow = Ly['Flow'] = V.add((N, N, N), CNT, ub = 1, mask = is_dest & (E != ZERO)[None, :, :] & on_path & (K[None, :, None] != K[:, None, None]))
+	is_src = (K == N-1)[None, :]
+	Rw.add((N, N), [ (1, Flow.transpose(0, 2, 1)), (-1, Flow) ], EQ, np.identity(N) - is_src, is_dest[:, :, 0]) # one unit from root to v_j
+	Rw.add((N, N), [ (1, Flow.transpose(1, 2, 0)), (-(N-1), E) ], LE, 0)                 # flow only across edges
+	Rw.add((N, N), [ (1, A), (-1, Flow.transpose(2, 0, 1)) ], EQ, 0, A >= 0)              # ancestor iff flow to v_j enters v_i
+
+def _add_cost_constraints(V, Rw, R, C, E, seg_weights, n, l, r, c_max, Ly):
+	N = 2*n-1
+	C_seg = C[:, l:]
+	is_edge = (E != ZERO)[:, :, None]
+	X = Ly['X_cost'] = V.add((N, N, r), INT, ub = c_max, mask = is_edge)
+	X_abs, _ = _add_abs(V, Rw, (N, N, r), [ (1, C_seg[:, None, :]), (-1, C_seg[None, :, :]) ], 0, is_edge)
+	Ly['X_cost_abs'] = X_abs
+	Rw.add((N, N, r), [ (1, X), (-c_max, E[:, :, None]) ], LE, 0, is_edge) # no cost if no edge exists
+	Rw.add((N, N, r), [ (1, X), (-1, X_abs), (-(c_max+1), E[:, :, None]) ], GE, -(c_max+1), is_edge) # cost is difference between copy number
+	Rw.add((N, N), [ (1, R), (-seg_weights, X) ], EQ, 0)
+
+def _add_bp_appearance_constraints(V, Rw, C_bin, W, E, rep, n, l, Ly, mode):
+	N = 2*n-1
+	C_bp = C_bin[:, :l]
+	is_edge = (E != ZERO)[:, :, None]
+	X = Ly['X_bp'] = V.add((N, N, l), INT, ub = 3, mask = is_edge) # only 0 if copy num goes from 0 to 1 across edge (i,j)
+	Rw.add((N, N, l), [ (1, X), (-1, C_bp[:, None, :]), (1, C_bp[None, :, :]), (1, E[:, :, None]) ], EQ, 2, is_edge)
+	X_bin, Ly['X_bp_bin'] = _add_bin_rep(V, Rw, X, 3, mode)
+	Rw.add((N, N, l), [ (1, W), (1, X_bin) ], EQ, 1, is_edge) # set W as bp appearance. mates share W so appear on same edge
+	Rw.add((l,), [ (1, W.reshape(N*N, l).T) ], EQ, 1, rep == np.arange(l)) # breakpoints only appear once in the tree
+
+def _add_ancestry_condition_constraints(V, Rw, C_bin, A, W, U, rep, m, N, l, Ly, form):
+	C_bp = C_bin[:, :l]
+	K = np.arange(N)
+	is_anc = A != ZERO # v_i can be an ancestor of v_j
+	is_rep = rep == np.arange(l)
+	W_node = Ly['W_node'] = V.add((N, l), BIN, mask = (K < N-1)[:, None] & is_rep)[:, rep] # no breakpoint appears at the root
+	Rw.add((N, l), [ (1, W_node), (-1, W.transpose(1, 2, 0)) ], EQ, 0, is_rep) # 1 iff breakpoint b appears at node v_j
+	X = Ly['X_anc'] = V.add((N, N, l), BIN, mask = is_anc[:, :, None]) # X[i, j, b] == A[i, j] && C_bin[j, b]
+	Rw.add((N, N, l), [ (1, X), (-1, A[:, :, None]), (-1, C_bp[None, :, :]) ], GE, -1, is_anc[:, :, None])
+	Rw.add((N, N, l), [ (1, X), (-1, A[:, :, None]) ], LE, 0, is_anc[:, :, None])
+	Rw.add((N, N, l), [ (1, X), (-1, C_bp[None, :, :]) ], LE, 0, is_anc[:, :, None])
+	Y = Ly['Y'] = V.add((N, l), CNT, ub = N, mask = is_anc.any(axis = 1)[:, None]) # leaves are ancestors of nothing
+	Rw.add((N, l), [ (1, Y), (-1, A[:, None, :]), (1, X.transpose(0, 2, 1)) ], EQ, 0)
+	Y_bin, Ly['Y_bin'] = _add_bin_rep(V, Rw, Y, N, form['binarization'])
+	if form['ordering'] == 'precedence':
+		terms, rhs, mask = _add_precedence_constraints(V, Rw, A, W_node, Y_bin, N, l, Ly)
+	else:
+		terms, rhs, mask = _add_block_constraints(V, Rw, A, W_node, Y_bin, N, l, Ly, form['binarization'])
+	Phi = Ly['Phi'] = V.add((m, l), CNT)
+	phi_rows = Rw.add((m, l), [ (1, Phi) ] + _neg(_get_phi_terms(U, { 'C_bin': C_bin, 'l': l })), EQ, 0)
+	Rw.add((m, l, l), [ (1, Phi[:, :, None]), (-1, Phi[:, None, :]) ] + terms, GE, rhs, mask) # Phi[p,s] >= Phi[p,t] if
+	return phi_rows                                                                        # s appears in ancestor of t and is never lost
+
+# returns terms, rhs and mask of the row Phi[p,s] - Phi[p,t] + terms >= rhs for every sample p and breakpoints s, t
+#   with one integer Z[i, j, s, t] == 3 - w_{i,s} - w_{j,t} - a_{i,j} + \bar{y}_{i,s} for every pair of nodes
+def _add_block_constraints(V, Rw, A, W_node, Y_bin, N, l, Ly, mode):
+	is_anc = A != ZERO
+	Z = Ly['Z'] = V.add((N, N, l, l), INT, ub = 4, mask = is_anc[:, :, None, None])
+	Z_bin, Ly['Z_bin'] = _add_bin_rep(V, Rw, Z, 4, mode) # Z_bin 0 if bp s appears in ancestor v_i to bp t appearing in descendant v_j
+	Z_bin[~is_anc] = V.const(1)                    # never 0 if v_i is not an ancestor of v_j
+	Rw.add((N, N, l, l), [ (1, Z), (1, W_node[:, None, :, None]), (1, W_node[None, :, None, :]), (1, A[:, :, None, None]), (-1, Y_bin[:, None, :, None]) ], EQ, 3, is_anc[:, :, None, None])
+	Z_sum = Z_bin.reshape(N*N, l, l).transpose(1, 2, 0)[None, :, :, :]
+	return [ (1, Z_sum) ], N*N - 1, None
+
+# returns terms, rhs and mask of the row Phi[p,s] - Phi[p,t] + terms >= rhs for every sample p and breakpoints s, t
+#   with one binary P[s, t] forced to 1 if s appears in an ancestor of the node t appears at and s is never lost
+#  notes: P and D only have lower bounds. raising either only adds Phi rows so the optimum is unchanged
+def _add_precedence_constraints(V, Rw, A, W_node, Y_bin, N, l, Ly):
+	is_anc = A != ZERO
+	has_desc = is_anc.any(axis = 1) & (np.arange(N) < N-1) # no breakpoint appears at the root so it precedes nothing
+	not_st = ~np.identity(l, dtype = bool)                   # a breakpoint appears at one node so never precedes itself
+	D = Ly['D'] = V.add((N, l), BIN, mask = has_desc[:, None]) # D[i, t] 1 if bp t appears at a descendant of v_i
+	Rw.add((N, N, l), [ (1, D[:, None, :]), (-1, A[:, :, None]), (-1, W_node[None, :, :]) ], GE, -1, (is_anc & has_desc[:, None])[:, :, None])
+	P = Ly['P'] = V.add((l, l), BIN, mask = not_st)
+	Rw.add((N, l, l), [ (1, P[None, :, :]), (-1, W_node[:, :, None]), (-1, D[:, None, :]), (1, Y_bin[:, :, None]) ], GE, -1, has_desc[:, None, None] & not_st[None, :, :])
+	return [ (-1, P[None, :, :]) ], -1, not_st[None, :, :]
+
+def _add_segment_copy_num_constraints(Rw, Gam, C, Q, W, l):
+	N, _ = Gam.shape
+	Rw.add((N, l), [ (1, Gam), (-Q[None, :, :], C[:, None, l:]) ], EQ, 0) # define copy num of segment containing breakpoint
+	Rw.add((N, l), [ (1, C[:, :l]), (-1, Gam) ], LE, 0)                   # cp num breakpoint cant exceed cp num of seg containing bp
+	Rw.add((N, l), [ (1, Gam), (-1, W.transpose(1, 2, 0)) ], GE, 0)       # at least 1 if bp appears at node j
+
+def _add_bpf_penalty(V, Rw, S, Pi, U, C, Gam, l):
+	m, _ = S.shape
+	S_abs, rows = _add_abs(V, Rw, (m, l), _get_bpf_terms(U, { 'C': C, 'Gam': Gam, 'Pi': Pi, 'l': l }), 0)
+	Rw.add((m, l), [ (1, S), (-1, S_abs) ], EQ, 0)
+	return S_abs, rows
+
+#
+#   TERMS MULTIPLYING U
+#
+
+# each returns terms (see Rows.add) depending on U. I (dict) holds the variable indices and Pi used by build
+
+def _get_phi_terms(U, I): # sum_k u_p,k * c_bin_k,b. axes are p, b
+	return [ (U[:, None, :], I['C_bin'][:, :I['l']].T[None, :, :]) ]
+
+def _get_bpf_terms(U, I): # pi_p,b * segment copy num estimate - bp copy num estimate. axes are p, b
+	sg_cpnum_est = (I['Pi'][:, :, None] * U[:, None, :], I['Gam'].T[None, :, :])
+	bp_cpnum_est = (-U[:, None, :], I['C'][:, :I['l']].T[None, :, :])
+	return [ sg_cpnum_est, bp_cpnum_est ]
+
+def _get_err_terms(U, I): # -f_hat_p,s. axes are p, s
+	return [ (-U[:, None, :], I['C'].T[None, :, :]) ]
+
+def _get_f_hat_err_terms(C, U): # -f_hat_s of a single sample with variables U. axis is s
+	return [ (-C.T, U[None, :]) ]
+
+def _neg(terms):
+	return [ (-np.asarray(coef), X) for coef, X in terms ]
+
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # #
+#   G U R O B I   V A R I A B L E   M A K E R S   #
+# # # # # # # # # # # # # # # # # # # # # # # # # #
+
+# layout of every variable of the model. variables are only created in one MVar by create. an index array
+#   holds the index of a variable, ZERO where no variable was made or -1-k for the constant k
+class Vars:
+
+	def __init__(self):
+		self.lbs, self.ubs, self.vtypes = [], [], []
+		self.num = 0
+		self.consts = { 0.0: ZERO } # index of each constant value
+
+	# returns np.array of int with shape (tuple) holding the index of each new variable. variables are only
+	#   made where mask (np.array of bool or None) is True. ZERO elsewhere
+	def add(self, shape, vtype, lb = 0.0, ub = INF, mask = None):
+		mask = np.broadcast_to(True if mask is None else mask, shape)
+		size = int(mask.sum())
+		X = np.full(shape, ZERO, dtype = int)
+		X[mask] = np.arange(self.num, self.num + size)
+		self.num += size
+		self.lbs.append(np.full(size, lb, dtype = float))
+		self.ubs.append(np.full(size, ub, dtype = float))
+		self.vtypes.append(np.array([ vtype ] * size))
+		return X
+
+	# returns np.array of int holding the index of a constant for each element of vals (np.array of float)
+	def const(self, vals):
+		vals = np.asarray(vals, dtype = float)
+		return np.array([ self.consts.setdefault(v, -1 - len(self.consts)) for v in vals.ravel() ], dtype = int).reshape(vals.shape)
+
+	# returns value (np.array of float) of each constant. constant k is at position k
+	def get_consts(self):
+		consts = np.zeros(len(self.consts))
+		for v, X in self.consts.items():
+			consts[-1 - X] = v
+		return consts
+
+	# returns lower bound, upper bound and type (np.array) of every variable
+	def get_bounds(self):
+		return np.concatenate(self.lbs), np.concatenate(self.ubs), np.concatenate(self.vtypes)
+
+	# returns MVar of all variables added to the layout
+	def create(self, mod):
+		lbs, ubs, vtypes = self.get_bounds()
+		return mod.addMVar(self.num, lb = lbs, ub = ubs, vtype = vtypes)
+
+# sparse rows of every constraint of the model over the variables of V (Vars). constraints are only created in
+#   one call by create
+class Rows:
+
+	def __init__(self, V):
+		self.V = V
+		self.rows, self.cols, self.vals, self.senses, self.rhss, self.base_rhss = [], [], [], [], [], []
+		self.num = 0
+		self.indicators = []
+
+	#  input: shape (tuple) one constraint is added for each element of shape
+	#         terms (list of tuple) coef (float or np.array) and X (np.array of int) index array of each term.
+	#           both are broadcast against shape. axes of X after those of shape are summed over
+	#         sense (str) gp.GRB.EQUAL, gp.GRB.LESS_EQUAL or gp.GRB.GREATER_EQUAL
+	#         rhs (float or np.array) right hand side. broadcast against shape
+	#         mask (np.array of bool or None) constraints are only added where mask is True
+	# output: rows (np.array of int) with shape. row of each constraint. -1 where there is none
+	#  notes: constants are moved to the right hand side. constraints left without variables are not added
+	def add(self, shape, terms, sense, rhs, mask = None):
+		mask = np.broadcast_to(True if mask is None else mask, shape)
+		k = int(mask.sum())
+		rows = -np.ones(shape, dtype = int)
+		rows[mask] = np.arange(0, k)
+		rows_X, cols, vals = _get_entries(rows, terms)
+		is_var = cols >= 0
+		has_var = np.bincount(rows_X[is_var], minlength = k) > 0
+		base_rhs = np.broadcast_to(np.asarray(rhs, dtype = float), shape)[mask]
+		rhs = base_rhs - _get_const_sums(rows_X, cols, vals, self.V.get_consts(), k)
+
+		new_rows = -np.ones(k, dtype = int)
+		new_rows[has_var] = np.arange(self.num, self.num + has_var.sum())
+		rows[mask] = new_rows
+		self.num += int(has_var.sum())
+		self.rows.append(new_rows[rows_X[is_var]])
+		self.cols.append(cols[is_var])
+		self.vals.append(vals[is_var])
+		self.senses.append(np.array([ sense ] * int(has_var.sum())))
+		self.rhss.append(rhs[has_var])
+		self.base_rhss.append(base_rhs[has_var])
+		return rows
+
+	# adds indicator constraints Y == val -> X sense rhs for each element of Y and X (np.array of int) index
+	#   arrays of variables with the same shape. val (0 or 1), sense (str) and rhs (float) are shared
+	def add_indicators(self, Y, val, X, sense, rhs):
+		self.indicators += [ (y, val, x, sense, rhs) for y, x in zip(Y.ravel().tolist(), X.ravel().tolist()) ]
+
+	# adds every constraint to mod over variables x (gp.MVar) and returns them as gp.MConstr. indicator
+	#   constraints are added one at a time after them and are not returned
+	def create(self, mod, x):
+		M, senses, rhss = self.get_matrix()
+		constrs = mod.addMConstr(M, x, senses, rhss)
+		if self.indicators:
+			X = x.tolist()
+			for y, val, i, sense, rhs in self.indicators:
+				mod.addGenConstrIndicator(X[y], val, gp.LinExpr(X[i]), sense, rhs)
+		return constrs
+
+	# returns coefficients (sps.csr_matrix) [constraints, variables], sense and right hand side (np.array) of
+	#   every constraint. indicator constraints are left out
+	def get_matrix(self):
+		M = sps.csr_matrix((np.concatenate(self.vals), (np.concatenate(self.rows), np.concatenate(self.cols))), shape = (self.num, self.V.num))
+		return M, np.concatenate(self.senses), np.concatenate(self.rhss)
+
+	# returns right hand side (np.array of float) of every constraint before constants were moved to it
+	def get_base_rhs(self):
+		return np.concatenate(self.base_rhss)
+
+# returns row, column and value (np.array) of every nonzero of terms (see Rows.add) in the given rows. columns
+#   of constants are negative. ZERO is left out
+def _get_entries(rows, terms):
+	entries = []
+	for coef, X in terms:
+		X = np.asarray(X)
+		rows_X, X, coef = np.broadcast_arrays(rows.reshape(rows.shape + (1,) * (X.ndim - rows.ndim)), X, np.asarray(coef, dtype = float))
+		keep = (rows_X >= 0) & (X != ZERO)
+		entries.append((rows_X[keep], X[keep], coef[keep]))
+	if not entries:
+		return np.zeros(0, dtype = int), np.zeros(0, dtype = int), np.zeros(0)
+	return tuple([ np.concatenate([ e[i] for e in entries ]) for i in xrange(0, 3) ])
+
+# returns sum (np.array of float) [num_rows] of the constant entries (see _get_entries) of each row
+def _get_const_sums(rows, cols, vals, consts, num_rows):
+	is_const = cols < 0
+	return np.bincount(rows[is_const], vals[is_const] * consts[-1 - cols[is_const]], minlength = num_rows)
+
+# changes the coefficients of mod of model I (dict) with 'vars', 'constrs', 'rhs' and 'consts' to those of
+#   families (list of tuple) rows (np.array of int) and terms (see Rows.add). rows with constants also get
+#   a new right hand side
+def _set_coeffs(mod, I, families):
+	X, constrs = I['vars'], I['constrs']
+	for rows, terms in families:
+		rows_X, cols, vals = _get_entries(rows, terms)
+		is_var = cols >= 0
+		for row, col, val in zip(rows_X[is_var], cols[is_var], vals[is_var]):
+			mod.chgCoeff(constrs[row], X[col], val)
+		const_rows, rows_X = np.unique(rows_X[~is_var], return_inverse = True)
+		if len(const_rows):
+			rhs = I['rhs'][const_rows] - _get_const_sums(rows_X, cols[~is_var], vals[~is_var], I['consts'], len(const_rows))
+			mod.setAttr(gp.GRB.Attr.RHS, [ constrs[row] for row in const_rows ], rhs.tolist())
+
+# returns index array of binaries Y with the shape of index array X. Y = 0 if X == 0. Y = 1 if X != 0. also
+#   returns (tuple) Y and the index array of the bits of X for the layout of build. constant elements of X
+#   have constant Y and bits. X (integer, 0 <= X <= vmax) is linked to Y by mode (str) one of BINARIZATION.
+#   'bits' writes X with floor(log2(vmax)) + 1 binaries. 'bigm' uses the rows Y <= X <= vmax * Y and
+#   'indicator' the indicator constraints Y == 0 -> X <= 0 and Y == 1 -> X >= 1. both make no bits
+def _add_bin_rep(V, Rw, X, vmax, mode = 'bits'):
+	shape = X.shape
+	is_var = X >= 0
+	num_bits = int(math.floor(math.log(vmax, 2))) + 1 if mode == 'bits' else 0 # maximum number of bits required
+	Y = V.add(shape, BIN, mask = is_var)
+	Z = V.add(shape + (num_bits,), BIN, mask = is_var[..., None]) # bit representation of X
+	vals = np.rint(V.get_consts()[-1 - X[~is_var]]).astype(int)
+	Y[~is_var] = V.const(vals != 0)
+	Z[~is_var] = V.const((vals[:, None] >> np.arange(num_bits)) & 1)
+	if mode == 'bigm':
+		Rw.add(shape, [ (1, X), (-vmax, Y) ], LE, 0, is_var)
+		Rw.add(shape, [ (1, X), (-1, Y) ], GE, 0, is_var)
+	elif mode == 'indicator':
+		Rw.add_indicators(Y[is_var], 0, X[is_var], LE, 0)
+		Rw.add_indicators(Y[is_var], 1, X[is_var], GE, 1)
+	else:
+		Rw.add(shape, [ (2.0 ** np.arange(num_bits), Z), (-1, X[..., None]) ], EQ, 0, is_var)
+		Rw.add(shape + (num_bits,), [ (1, Z), (-1, Y[..., None]) ], LE, 0, is_var[..., None]) # Y must be 1 if any bits are 1
+		Rw.add(shape, [ (1, Y[..., None]), (-1, Z) ], LE, 0, is_var)                         # Y must be 0 if all bits are 0
+	return Y, (Y, Z)
+
+# returns index array of integers with the given shape bounding the absolute value of the sum of terms (see
+#   Rows.add) plus const from above and the rows (tuple of np.array) of both bounds. only made where mask
+#   (np.array of bool or None) is True
+def _add_abs(V, Rw, shape, terms, const, mask = None):
+	X_abs = V.add(shape, INT, mask = mask)
+	rows_pos = Rw.add(shape, [ (1, X_abs) ] + _neg(terms), GE, const, mask)
+	rows_neg = Rw.add(shape, [ (1, X_abs) ] + terms, GE, -np.asarray(const), mask)
+	return X_abs, (rows_pos, rows_neg)
@@ -0,0 +1,478 @@
+#     file: restarts.py
+#  created: 10/18/2026
+# modified: 10/18/2026
+#  purpose: Runs independent random restarts of the cordinate descent algorithm (solver.get_UCE)
+#             across a pool of worker processes and picks the restart with the best objective
+
+
+# # # # # # # # # # #
+#   I M P O R T S   #
+# # # # # # # # # # #
+
+import sys      # for command line arguments
+import os       # for manipulating files and folders
+import time
+import math
+import traceback
+import numpy as np
+import multiprocessing as mp
+
+# custom modules
+import solver as sv
+import checkpoint as ck
+import matrix_model as mm
+
+
+# # # # # # # # # # # # #
+#   C O N S T A N T S   #
+# # # # # # # # # # # # #
+
+MAX_SEED = 2**31 - 1
+POLL_TIME = 1.0 # seconds between checks that the worker process of a running task is still alive
+
+_run = {} # settings shared by every restart run in a process. set by _init_worker
+
+
+# # # # # # # # # # # # #
+#   F U N C T I O N S   #
+# # # # # # # # # # # # #
+
+#  input: args (tuple) positional arguments for solver.get_UCE (F, Q, G, A, H, n, c_max, lamb1, lamb2,
+#           max_iters, time_limit)
+#         num_restarts (int) number of random restarts to run
+#         num_processors (int or None) core budget shared by concurrent restarts and their Gurobi threads. None
+#           runs one restart at a time and leaves the number of Gurobi threads to Gurobi. see get_split
+#         seed (int or None) base seed. restart i is seeded with seed + i. None picks a random base seed
+#         race (bool) share the best objective of finished restarts with running restarts. running
+#           restarts use it as a cutoff and are abandoned once they cannot beat it
+#         checkpoint_dname (str or None) directory each finished restart is saved to. None saves nothing
+#         resume (bool) load restarts already saved in checkpoint_dname instead of running them again
+#         checkpoint_iters (bool) also save every cordinate descent iterate so a pre-empted restart
+#           continues where it stopped
+#         threads_per_solve (int or None) fixed number of Gurobi threads per model. None lets get_split
+#           choose and hands the cores of finished restarts to the ones still running
+#         trace_fname (str or None) .jsonl file every iteration and finished restart is recorded in. it is
+#           appended to if resuming and cleared otherwise
+#         stop (PlateauStop or None) rule deciding when to stop launching new restarts. None runs all
+#         inits (list or None) init (tuple or None) passed to solver.get_UCE for each restart. None entries
+#           start from a random U. see get_split_inits
+#         budget (Budget or None) wall-clock budget of the run. None runs without a deadline
+#         collapse (bool) end a restart once it reaches a tree and copy numbers another restart already
+#           visited. see solver.get_fingerprint
+#         formulation (dict or None) choices of the get_C model. see matrix_model.build
+#         weights (np.array of int or None) [l+r] number of columns each column of F stands for. see
+#           matrix_model.build
+#         backend (str) one of solver.BACKENDS
+#         cache (c_cache.CCache or None) solutions of get_C reused by later iterations and restarts. each
+#           worker process gets its own copy of the memory table. a directory given to it is shared
+# output: results (list of tuple) result of solver.get_UCE for each restart in order of restart index
+#         stats (list of dict) stats filled by solver.get_UCE for each restart
+#  notes: restarts are launched in order of restart index but collected in the order they finish.
+#           entries of results and stats are None for restarts never launched because of stop or budget
+def run_restarts(args, num_restarts, num_processors, seed = None, race = False, checkpoint_dname = None, resume = False, checkpoint_iters = False, threads_per_solve = None, trace_fname = None, stop = None, inits = None, budget = None, collapse = False, formulation = None, weights = None, backend = 'gurobi', cache = None):
+	seeds = get_seeds(num_restarts, seed)
+	results = [ None for _ in xrange(0, num_restarts) ]
+	stats = [ None for _ in xrange(0, num_restarts) ]
+	best_obj = mp.Value('d', float('inf')) if race else None
+	if trace_fname is not None and not resume:
+		open(trace_fname, 'w').close()
+	inits = inits or [ None for _ in xrange(0, num_restarts) ]
+
+	if checkpoint_dname is not None:
+		ck.setup(checkpoint_dname, args, resume, (inits, mm.get_formulation(formulation), weights, backend))
+		for i in xrange(0, num_restarts):
+			results[i], stats[i] = ck.load_restart(ck.restart_fname(checkpoint_dname, i))
+		num_resumed = sum([ res is not None for res in results ])
+		if num_resumed > 0:
+			printnow('resumed ' + str(num_resumed) + ' of ' + str(num_restarts) + ' random restarts from checkpoint\n')
+		best_i = get_best(results)
+		if race and best_i is not None:
+			best_obj.value = results[best_i][5]
+
+	tasks = [ (i, seeds[i], args, inits[i], None) for i in xrange(0, num_restarts) if results[i] is None ]
+	num_workers, threads = get_split(num_processors, len(tasks), threads_per_solve)
+	manager = mp.Manager() if collapse else None # serves explored to every worker process
+	run = { 'best_obj': best_obj, 'checkpoint_dname': checkpoint_dname, 'checkpoint_iters': checkpoint_iters,
+	        'num_cores': num_processors, 'threads': threads_per_solve, 'active': mp.Value('i', 0), 'trace_fname': trace_fname,
+	        'explored': manager.dict() if collapse else None, 'formulation': formulation, 'weights': weights, 'backend': backend, 'cache': cache }
+	if tasks:
+		_print_split(num_workers, threads, num_processors)
+
+	if stop is not None:
+		for res in results: # restarts loaded from checkpoint count towards the stopping rule
+			if res is not None:
+				stop.update(res)
+
+	def on_done(out):
+		i, results[i], stats[i] = out
+		_print_progress(sum([ res is not None for res in results ]), num_restarts)
+		if stop is not None:
+			stop.update(results[i])
+		if budget is not None:
+			budget.update(stats[i])
+
+	def prepare(task): # gives the restart its share of the budget as it is launched
+		if budget is None:
+			return task
+		return task[:4] + (budget.get_deadline(len(tasks) + 1, num_workers),)
+
+	def can_launch():
+		return (stop is None or stop.reason is None) and (budget is None or budget.can_launch())
+
+	def on_lost(task, err_msg): # worker process died or its result could not be sent back
+		return task[0], (None, None, None, None, None, None, err_msg), { 'status': 'error' }
+
+	try:
+		_run_tasks(tasks, _run_restart, num_workers, run, on_done, can_launch, on_lost, prepare)
+	finally:
+		if manager is not None:
+			manager.shutdown()
+
+	_print_summary(stats)
+	for rule in [stop, budget]:
+		if rule is not None and rule.reason is not None:
+			printnow('stopped launching restarts: ' + rule.reason + '. skipped ' + str(len(tasks)) + ' of ' + str(num_restarts) + ' random restarts\n')
+	return results, stats
+
+#  input: args (tuple) positional arguments for solver.get_UCE_sweep (F, Q, G, A, H, n, c_max, lambs,
+#           max_iters, time_limit)
+#         num_restarts (int) number of random restarts to run. every restart solves every grid point
+#         num_processors (int or None) core budget shared by concurrent restarts and their Gurobi threads. None
+#           runs one restart at a time and leaves the number of Gurobi threads to Gurobi. see get_split
+#         seed (int or None) base seed. restart i is seeded with seed + i. None picks a random base seed
+#         threads_per_solve (int or None) fixed number of Gurobi threads per model
+#         trace_fnames (list of str or None) .jsonl trace file for each grid point
+#         formulation (dict or None) choices of the get_C model. see matrix_model.build
+#         weights (np.array of int or None) [l+r] number of columns each column of F stands for. see
+#           matrix_model.build
+#         backend (str) one of solver.BACKENDS
+#         cache (c_cache.CCache or None) solutions of get_C reused by later iterations and restarts. see
+#           run_restarts
+# output: results (list of list of tuple) results[g][i] is result of restart i for grid point g
+def run_sweep(args, num_restarts, num_processors, seed = None, threads_per_solve = None, trace_fnames = None, formulation = None, weights = None, backend = 'gurobi', cache = None):
+	lambs = args[7]
+	seeds = get_seeds(num_restarts, seed)
+	results = [ [ None for _ in xrange(0, num_restarts) ] for _ in lambs ]
+	for trace_fname in trace_fnames or []:
+		open(trace_fname, 'w').close()
+
+	tasks = [ (i, seeds[i], args) for i in xrange(0, num_restarts) ]
+	num_workers, threads = get_split(num_processors, len(tasks), threads_per_solve)
+	run = { 'num_cores': num_processors, 'threads': threads_per_solve, 'active': mp.Value('i', 0), 'trace_fnames': trace_fnames, 'formulation': formulation, 'weights': weights, 'backend': backend, 'cache': cache }
+	_print_split(num_workers, threads, num_processors)
+
+	num_complete = [0]
+	def on_done(out):
+		i, sweep_results = out
+		for g, res in enumerate(sweep_results):
+			results[g][i] = res
+		num_complete[0] += 1
+		_print_progress(num_complete[0], num_restarts)
+
+	on_lost = lambda task, err_msg: (task[0], [ (None, None, None, None, None, None, err_msg) for _ in lambs ])
+	_run_tasks(tasks, _run_sweep_restart, num_workers, run, on_done, lambda: True, on_lost)
+	return results
+
+#  input: tasks (list of tuple) tasks for worker in the order they are launched. launched tasks are
+#           removed from the list
+#         worker (function) run on each task in a worker process
+#         num_workers (int) number of tasks run at the same time. 1 runs tasks in this process
+#         run (dict) settings shared by every task. see _init_worker
+#         on_done (function) called with the output of worker as each task finishes
+#         can_launch (function) called before each launch. no more tasks are launched once it returns False
+#         on_lost (function) called with a task (tuple) and err_msg (str) if its worker process died or its
+#           output could not be sent back. returns the output given to on_done in place of that of worker
+#         prepare (function or None) called on each task as it is launched. returns the task given to worker
+#  notes: a worker process killed by the operating system (e.g. when out of memory) never returns its task,
+#           so running tasks are polled and the process running each of them is checked every POLL_TIME
+def _run_tasks(tasks, worker, num_workers, run, on_done, can_launch, on_lost, prepare = None):
+	if prepare is None:
+		prepare = lambda task: task
+	if num_workers == 1:
+		_init_worker(run)
+		while tasks and can_launch():
+			on_done(worker(prepare(tasks.pop(0))))
+		return
+
+	run = dict(run, pids = mp.Array('i', len(tasks))) # pid of the worker process running each launched task
+	pool = mp.Pool(processes = num_workers, initializer = _init_worker, initargs = (run,))
+	running = {} # launch number mapped to task and its mp.pool.AsyncResult
+	def submit():
+		k = len(run['pids']) - len(tasks)
+		task = prepare(tasks.pop(0))
+		running[k] = (task, pool.apply_async(_run_task, ((k, worker, task),)))
+	try:
+		while tasks and len(running) < num_workers and can_launch():
+			submit()
+		while running:
+			k, out = _wait_any(running, run, on_lost)
+			del running[k]
+			on_done(out)
+			if tasks and can_launch():
+				submit()
+	finally:
+		pool.terminate()
+		pool.join()
+
+#  input: running (dict) launch number mapped to task and mp.pool.AsyncResult of every running task
+#         run (dict) settings of _run_tasks with the pid of the worker process running each launched task
+#         on_lost (function) see _run_tasks
+# output: k (int) launch number of a finished task
+#         out (tuple) output of its worker or of on_lost if the worker process died or the output was lost
+def _wait_any(running, run, on_lost):
+	pids = run['pids']
+	while True:
+		for k in sorted(running):
+			task, async_res = running[k]
+			async_res.wait(POLL_TIME / len(running))
+			if async_res.ready():
+				try:
+					return k, async_res.get()
+				except Exception: # output could not be sent back
+					return k, on_lost(task, traceback.format_exc())
+			if pids[k] != 0 and not _is_alive(pids[k]):
+				async_res.wait(POLL_TIME) # output may have been sent just before the process died
+				if not async_res.ready():
+					with run['active'].get_lock(): # the task never got to mark itself as finished
+						run['active'].value -= 1
+					return k, on_lost(task, 'worker process ' + str(pids[k]) + ' died while running this task')
+
+# records the pid of this worker process under launch number k (int) and runs worker (function) on task (tuple)
+def _run_task(job):
+	k, worker, task = job
+	_run['pids'][k] = os.getpid()
+	return worker(task)
+
+def _is_alive(pid):
+	try:
+		os.kill(pid, 0)
+	except OSError:
+		return False
+	return True
+
+#  input: res (tuple) U, C, E, R, W, obj_val, err_msg of best solution with n leaves
+#         n (int) number of leaves of res
+#         num_restarts (int) number of restarts with n+1 leaves
+# output: inits (list of tuple or None) init for each restart with n+1 leaves (see run_restarts). restart i
+#           splits the leaf with the i-th largest total usage. restarts beyond the n leaves get None
+def get_split_inits(res, n, num_restarts):
+	U, C, E = res[:3]
+	leaves = list(np.argsort(-U[:, :n].sum(axis = 0), kind = 'mergesort'))
+	return [ sv.split_leaf(U, C, E, n, leaves[i]) if i < n else None for i in xrange(0, num_restarts) ]
+
+#  input: results (list of tuple) result of solver.get_UCE for each restart (see run_restarts)
+# output: best_i (int or None) index of restart with smallest objective. ties go to the lowest index.
+#           None if every restart failed
+def get_best(results):
+	best_i = None
+	for i, res in enumerate(results):
+		if res is None or res[6] is not None: # restart did not finish or returned an error message
+			continue
+		if best_i is None or res[5] < results[best_i][5]:
+			best_i = i
+	return best_i
+
+# decides when launching more random restarts is unlikely to improve the best objective
+class PlateauStop:
+
+	#  input: window (int) stop once the best objective has not improved in this many finished restarts
+	#         rel_tol (float) improvements smaller than rel_tol * |best objective| do not count. objectives
+	#           within rel_tol of each other are considered the same local optimum
+	#         max_prob (float or None) also stop once the estimated probability that the next restart
+	#           reaches a local optimum not seen yet drops below max_prob. None disables this rule
+	def __init__(self, window, rel_tol = 1e-4, max_prob = None):
+		self.window = window
+		self.rel_tol = rel_tol
+		self.max_prob = max_prob
+		self.best = None
+		self.since_best = 0 # number of finished restarts since the best objective last improved
+		self.optima = []    # [obj_val, number of restarts that reached it] for each distinct local optimum
+		self.num_done = 0
+		self.reason = None  # str explaining why launching stopped. None while restarts should be launched
+
+	# records finished restart res (tuple) returned by solver.get_UCE and updates reason
+	def update(self, res):
+		self.num_done += 1
+		obj_val = res[5] if res[6] is None else None
+		if obj_val is not None and (self.best is None or obj_val < self.best - self.rel_tol * abs(self.best)):
+			self.best = obj_val
+			self.since_best = 0
+		else:
+			self.since_best += 1
+		if obj_val is not None:
+			self._add_optimum(obj_val)
+
+		if self.reason is not None:
+			return
+		if self.since_best >= self.window:
+			self.reason = 'best objective did not improve by more than ' + str(self.rel_tol) + ' (relative) in the last ' + str(self.window) + ' restarts'
+		elif self.max_prob is not None and self.num_done >= self.window and self.get_unseen_prob() < self.max_prob:
+			self.reason = 'estimated probability of reaching an unseen local optimum fell to ' + str(round(self.get_unseen_prob(), 4))
+
+	# returns Good-Turing estimate of the probability that the next restart reaches an unseen local optimum.
+	#   this is the fraction of solved restarts whose local optimum was reached exactly once
+	def get_unseen_prob(self):
+		num_solved = sum([ cnt for _, cnt in self.optima ])
+		if num_solved == 0:
+			return 1.0
+		return float(len([ 1 for _, cnt in self.optima if cnt == 1 ])) / num_solved
+
+	def _add_optimum(self, obj_val):
+		for optimum in self.optima:
+			if abs(obj_val - optimum[0]) <= self.rel_tol * max(abs(obj_val), abs(optimum[0])):
+				optimum[1] += 1
+				return
+		self.optima.append([obj_val, 1])
+
+# spreads a wall-clock budget over the random restarts of a run
+class Budget:
+
+	#  input: deadline (float) time.time() by which every restart must be finished
+	def __init__(self, deadline):
+		self.deadline = deadline
+		self.times = []    # seconds taken by each restart that finished before running out of time
+		self.reason = None # str explaining why launching stopped. None while restarts can be launched
+
+	def get_remaining(self):
+		return self.deadline - time.time()
+
+	# records stats (dict) filled by solver.get_UCE of a finished restart
+	def update(self, stats):
+		if stats.get('status') in ['converged', 'max_iters'] and not stats.get('resumed'):
+			self.times.append(stats['time'])
+
+	# returns True if a restart launched now is expected to finish before the deadline
+	def can_launch(self):
+		remaining = self.get_remaining()
+		if remaining <= 0:
+			self.reason = 'time budget ran out'
+		elif remaining <= self.get_expected():
+			self.reason = str(round(remaining, 1)) + ' second(s) of the time budget left but a restart takes ' + str(round(self.get_expected(), 1)) + ' second(s)'
+		return self.reason is None
+
+	# returns seconds a restart is expected to take. this is the mean of the restarts that finished within
+	#   their share of the budget. 0 if there are none
+	def get_expected(self):
+		return np.mean(self.times) if self.times else 0.0
+
+	#  input: num_left (int) number of restarts left to run including the one being launched
+	#         num_workers (int) number of restarts run at the same time
+	# output: deadline (float) time.time() by which the restart being launched must finish. the time left
+	#           is split evenly between the rounds of restarts still to run but a restart gets at least the
+	#           time restarts are expected to take
+	def get_deadline(self, num_left, num_workers):
+		num_rounds = int(math.ceil(float(num_left) / num_workers))
+		remaining = self.get_remaining()
+		return time.time() + min(remaining, max(remaining / num_rounds, self.get_expected()))
+
+#  input: num_cores (int or None) total core budget. None if the user did not give one
+#         num_tasks (int) number of restarts left to run
+#         threads_per_solve (int or None) fixed number of Gurobi threads per model
+# output: num_workers (int) number of restarts run at the same time
+#         threads (int or None) number of Gurobi threads each restart starts with. None is Gurobi's default,
+#           which uses every core
+#  notes: MIPs with few threads scale better side by side than one MIP with many threads, so restarts
+#           are run concurrently first and only leftover cores are given to Gurobi. without a core budget
+#           restarts run one at a time and Gurobi is left alone as it was before restarts ran in parallel
+def get_split(num_cores, num_tasks, threads_per_solve = None):
+	if num_cores is None:
+		return 1, threads_per_solve
+	if threads_per_solve is not None:
+		threads = min(threads_per_solve, num_cores)
+		return max(1, min(num_tasks, num_cores // threads)), threads
+	num_workers = max(1, min(num_tasks, num_cores))
+	return num_workers, max(1, num_cores // num_workers)
+
+# returns list of num_restarts seeds. seeds are consecutive starting at seed so runs can be reproduced
+def get_seeds(num_restarts, seed = None):
+	if seed is None:
+		seed = np.random.randint(0, MAX_SEED - num_restarts)
+	return [ (seed + i) % MAX_SEED for i in xrange(0, num_restarts) ]
+
+# sets settings shared by every restart run in this process
+def _init_worker(run):
+	global _run
+	_run = run
+
+#  input: task (tuple) restart index (int), seed (int), positional arguments for solver.get_UCE (tuple),
+#           init for solver.get_UCE (tuple or None), deadline for solver.get_UCE (float or None)
+# output: i (int) restart index
+#         res (tuple) U, C, E, R, W, obj_val, err_msg. err_msg holds the traceback if the restart raised
+#         stats (dict) stats filled by solver.get_UCE
+def _run_restart(task):
+	i, seed, args, init, deadline = task
+	best_obj, dname = _run['best_obj'], _run['checkpoint_dname']
+	iterate_fname = ck.iterate_fname(dname, i) if dname is not None and _run['checkpoint_iters'] else None
+	trace_fname = _run['trace_fname']
+	stats = {}
+	t_bgn = time.time()
+	_add_active(1)
+	try:
+		res = sv.get_UCE(*args, seed = seed, best_obj = best_obj, stats = stats, checkpoint_fname = iterate_fname, threads = _get_threads, trace_fname = trace_fname, restart_id = i, init = init, deadline = deadline,
+		                 explored = _run['explored'], formulation = _run['formulation'], weights = _run['weights'], backend = _run['backend'], cache = _run['cache'])
+	except Exception:
+		res = (None, None, None, None, None, None, traceback.format_exc())
+		stats['status'] = 'error'
+	finally:
+		_add_active(-1)
+	stats['time'] = time.time() - t_bgn
+	if trace_fname is not None:
+		sv.write_trace(trace_fname, { 'event': 'restart', 'restart': i, 'seed': seed, 'status': stats.get('status'), 'iters': stats.get('iters'), 'time': stats['time'], 'obj_val': res[5] })
+	if stats['status'] == 'error':
+		return i, res, stats
+	if best_obj is not None and res[6] is None:
+		with best_obj.get_lock(): # publish objective so running restarts can use it as cutoff
+			best_obj.value = min(best_obj.value, res[5])
+	if dname is not None and stats['status'] != 'budget': # restarts cut short are run again on resume
+		ck.save_restart(ck.restart_fname(dname, i), res, stats)
+		if iterate_fname is not None and os.path.exists(iterate_fname):
+			os.remove(iterate_fname)
+	return i, res, stats
+
+#  input: task (tuple) restart index (int), seed (int), positional arguments for solver.get_UCE_sweep (tuple)
+# output: i (int) restart index
+#         results (list of tuple) U, C, E, R, W, obj_val, err_msg for each grid point
+def _run_sweep_restart(task):
+	i, seed, args = task
+	_add_active(1)
+	try:
+		return i, sv.get_UCE_sweep(*args, seed = seed, threads = _get_threads, trace_fnames = _run['trace_fnames'], restart_id = i, formulation = _run['formulation'], weights = _run['weights'], backend = _run['backend'], cache = _run['cache'])
+	except Exception:
+		return i, [ (None, None, None, None, None, None, traceback.format_exc()) for _ in args[7] ]
+	finally:
+		_add_active(-1)
+
+def _add_active(k):
+	active = _run['active']
+	with active.get_lock():
+		active.value += k
+
+# returns number of Gurobi threads for the next solve. cores are split evenly between running restarts. None
+#   leaves it to Gurobi if there is no core budget
+def _get_threads():
+	if _run['threads'] is not None or _run['num_cores'] is None:
+		return _run['threads']
+	return max(1, _run['num_cores'] // max(1, _run['active'].value))
+
+def _print_split(num_workers, threads, num_cores):
+	threads = str(threads) if threads is not None else 'default number of'
+	cores = str(num_cores) if num_cores is not None else 'all'
+	printnow('scheduler: ' + str(num_workers) + ' concurrent restart(s) x ' + threads + ' Gurobi thread(s) on ' + cores + ' core(s)\n')
+
+def _print_progress(num_complete, num_restarts):
+	printnow(str(num_complete) + ' of ' + str(num_restarts) + ' random restarts complete\n')
+
+def _print_summary(stats):
+	num_cutoff = len([ st for st in stats if st is not None and st.get('status') == 'cutoff' ])
+	if num_cutoff > 0:
+		printnow(str(num_cutoff) + ' of ' + str(len(stats)) + ' random restarts abandoned since they could not beat the best objective\n')
+	num_collapsed = len([ st for st in stats if st is not None and st.get('status') == 'collapsed' ])
+	if num_collapsed > 0:
+		printnow(str(num_collapsed) + ' of ' + str(len(stats)) + ' random restarts collapsed into a solution another restart already explored\n')
+	num_hits = sum([ st.get('cache_hits', 0) for st in stats if st is not None ])
+	if num_hits > 0:
+		printnow(str(num_hits) + ' copy number step(s) reused a cached solution instead of solving get_C\n')
+
+def printnow(s):
+	sys.stdout.write(s)
+	sys.stdout.flush()
@@ -0,0 +1,58 @@
+#     file: segments.py
+#  created: 10/18/2026
+# modified: 10/18/2026
+#  purpose: Merges segments without breakpoints that have the same mixed copy numbers into one weighted
+#             segment before unmixing and expands the copy numbers of merged segments back afterwards
+
+
+# # # # # # # # # # #
+#   I M P O R T S   #
+# # # # # # # # # # #
+
+import numpy as np
+
+
+# # # # # # # # # # # # #
+#   F U N C T I O N S   #
+# # # # # # # # # # # # #
+
+#  input: F (np.array) [m, l+r] mixed copy number of l breakpoints, r segments across m samples
+#         Q (np.array) [l, r] binary indicator that breakpoint is in segment
+#         tol (float) segments without breakpoints are merged if their mixed copy numbers round to the same
+#           multiple of tol in every sample. 0 only merges segments with identical mixed copy numbers
+# output: F (np.array) [m, l+r'] r' is number of merged segments. each has the mean of its segments
+#         Q (np.array) [l, r']
+#         weights (np.array of int) [l+r'] number of columns of input F each column of output F stands for
+#         seg_map (np.array of int) [r] merged segment of each segment of input F
+#  notes: segments with breakpoints are never merged. merging identical segments is lossless since the
+#           unmixing error and tree cost of a merged segment are counted once for each of its segments
+def merge_segments(F, Q, tol):
+	l, r = Q.shape
+	keys = {}
+	seg_map = np.zeros(r, dtype = int)
+	for s in xrange(0, r):
+		if Q[:, s].any():
+			key = ('bp', s)
+		elif tol > 0:
+			key = tuple(np.rint(F[:, l+s] / tol).astype(int))
+		else:
+			key = tuple(F[:, l+s])
+		seg_map[s] = keys.setdefault(key, len(keys))
+	M = np.zeros((r, len(keys)), dtype = int) # M[s, k] == 1 iff segment s is in merged segment k
+	M[np.arange(r), seg_map] = 1
+	counts = M.sum(axis = 0)
+	F_mrg = np.hstack([ F[:, :l], F[:, l:].dot(M) / counts.astype(float) ])
+	return F_mrg, Q.dot(M), np.concatenate([ np.ones(l, dtype = int), counts ]), seg_map
+
+# returns C (np.array) [N, l+r'] copy numbers of the first segment in each merged segment of C (np.array)
+#   [N, l+r] with seg_map (np.array of int or None) of merge_segments. C is returned if seg_map is None
+def merge_copy_nums(C, seg_map, l):
+	if seg_map is None:
+		return C
+	_, firsts = np.unique(seg_map, return_index = True)
+	return C[:, np.concatenate([ np.arange(0, l), l + firsts ])]
+
+# returns C (np.array) [N, l+r] copy numbers of every segment from the copy numbers C (np.array) [N, l+r']
+#   of the merged segments with seg_map (np.array of int) of merge_segments
+def expand_copy_nums(C, seg_map, l):
+	return np.hstack([ C[:, :l], C[:, l:][:, seg_map] ])
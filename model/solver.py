@@ -1,7 +1,7 @@
 #     file: solver.py
 #   author: Jesse Eaton
 #  created: 9/30/2017
-# modified: 10/14/2017
+# modified: 10/18/2026
 #  purpose: Linear program solver of single instance of mixed copy number F, solving for either
 #              copy number C or mixture U where the other is assumed constant
 
@@ -14,8 +14,19 @@ import sys      # for command line arguments
 import os       # for manipulating files and folders
 import argparse # for command line arguments
 import math     # it's math. we're gonna need it
+import time     # for timing model building and solving
+import json     # for writing the per iteration trace
+import hashlib  # for fingerprinting visited solutions
 import numpy as np
-import gurobipy as gp
+import multiprocessing as mp
+from multiprocessing.pool import ThreadPool # gurobi releases the GIL while optimizing
+
+# custom modules
+import checkpoint as ck
+import matrix_model as mm
+import highs_model as hm
+
+gp = None # gurobipy. only imported by _import_gurobi once the gurobi backend is used so highs runs without it
 
 
 # # # # # # # # # # # # #
@@ -24,6 +35,11 @@ import gurobipy as gp
 
 U_MIN = 1*10**(-5)
 MAX_SOLVER_ITERS = 5000
+BUILDERS = ['matrix', 'loop'] # ways to build the model of get_C. see _build_C_model
+BACKENDS = ['gurobi', 'highs'] # solvers of get_C and get_U. see get_C
+CUTOFF_MSG = 'no solution better than the objective cutoff exists'
+NO_SOLUTION_MSG = 'solver found no feasible solution'
+BUDGET_MSG = 'time budget ran out before the first iteration finished'
 
 
 # # # # # # # # # # # # #
@@ -41,6 +57,35 @@ MAX_SOLVER_ITERS = 5000
 #         lamb2 (float) regularization term to weight breakpoint frequency error
 #         max_iters (int) maximum number of iterations to predict U then C if convergence not reached
 #         time_limit (int) maximum number of seconds the solver will run
+#         seed (int or None) seed for random initialization of U. None seeds from system entropy
+#         best_obj (multiprocessing.Value or None) best objective found by any other restart so far. read
+#           before every call to get_C and used as its cutoff. the restart is abandoned once it cannot beat it
+#         stats (dict or None) if given, filled with 'status' ('converged', 'max_iters', 'cutoff', 'budget', 'collapsed', 'no_solution' or 'error') and
+#           'iters' (number of cordinate descent iterations run)
+#         checkpoint_fname (str or None) file each finished iterate is saved to. if it already exists the
+#           cordinate descent resumes after the iterate saved in it
+#         threads (int, function or None) number of threads for each Gurobi model. a function returning
+#           the number is called before every solve so the count can change while the restart runs
+#         trace_fname (str or None) .jsonl file a record of timings and solver statistics is appended to
+#           after every iteration. see _get_trace_rec
+#         restart_id (int) id of this restart in the trace
+#         first_iterate (tuple or None) U, C, E, R, W, obj_val of an already solved first iteration. the
+#           cordinate descent continues from it instead of starting from a random U
+#         init (tuple or None) U, C, E to start from instead of a random U. C and E are given to the
+#           first get_C as a MIP start. U may be None to start from a random U anyway. see split_leaf. with
+#           symmetry breaking in formulation all three are relabeled to the order the model allows first
+#         deadline (float or None) time.time() by which the restart must finish. the time left is spread
+#           over the remaining iterations with later iterations getting shorter limits. see _get_time_limit
+#         explored (dict or None) fingerprint of every (E, C) visited by any restart mapped to the restart_id
+#           that visited it first. shared between restarts. the restart ends once it reaches a fingerprint
+#           of another restart since it would repeat that restart's iterations. see get_fingerprint
+#         formulation (dict or None) choices of the get_C model. see matrix_model.build. symmetry breaking only
+#           applies to the first get_C. see _get_iter_formulation
+#         weights (np.array of int or None) [l+r] number of columns each column of F stands for. see
+#           matrix_model.build
+#         backend (str) one of BACKENDS solving get_U and get_C. see get_C
+#         cache (c_cache.CCache or None) solutions of get_C already found by this or other restarts. an
+#           iteration whose input is in it skips get_C. solutions proven optimal are added to it
 # output: U (np.array of float) [m, 2n-1] 0 <= u_p,k <= 1. percent of sample p made by clone k
 #         C (np.array of int) [2n-1, l+r] int copy number c_k,s of mutation s in clone k
 #         E (np.array of int) [2n-1, 2n-1] e_i,j == 1 iff edge (i,j) is in tree. 0 otherwise
@@ -49,64 +94,228 @@ MAX_SOLVER_ITERS = 5000
 #         obj_val (float) objective value of final solution
 #         err_msg (None or str) None if no error occurs. str with error message if one does
 #  notes: l (int) is number of structural variants. r (int) is number of copy number regions
-def get_UCE(F, Q, G, A, H, n, c_max, lamb1, lamb2, max_iters, time_limit = None):
-	np.random.seed() # sets seed for running on multiple processors
+#         every get_C after the first starts from the C and E of the previous iterate. they stay feasible
+#           when only U changes so Gurobi begins with an incumbent instead of searching for one
+#         if abandoned because of best_obj, the last iterate that finished is returned. since the
+#           objective is not monotone across iterations this is a heuristic, not an exact bound
+#         if deadline passes, the last iterate that finished is returned as well
+#         if a later get_C finds no solution within its time limit, the last iterate that finished is returned.
+#           the highs backend cannot start from the previous iterate so this happens with short limits
+#         if collapsed into another restart because of explored, the current iterate is returned
+#         stats also gets 'cache_hits', the number of iterations whose get_C was found in cache
+def get_UCE(F, Q, G, A, H, n, c_max, lamb1, lamb2, max_iters, time_limit = None, seed = None, best_obj = None, stats = None, checkpoint_fname = None, threads = None, trace_fname = None, restart_id = 0, first_iterate = None, init = None, deadline = None, explored = None, formulation = None, weights = None, backend = 'gurobi', cache = None):
+	np.random.seed(seed) # sets seed for running on multiple processors
 	m = len(F)
+	if stats is None:
+		stats = {}
+	stats['status'] = 'max_iters'
+	stats['cache_hits'] = 0
+	prev = None # last finished iterate (U, C, E, R, W, obj_val)
+	model = {}  # get_C model built in the first iteration and updated with U in later ones
+	u_models = {} # get_U models built in the second iteration and updated with C in later ones
+
+	first_i = 0
+	if first_iterate is not None:
+		first_i, prev = 1, first_iterate
+		U, C, E, R, W, obj_val = prev
+		stats['iters'] = first_i
+	if checkpoint_fname is not None and os.path.exists(checkpoint_fname):
+		first_i, prev = ck.load_iterate(checkpoint_fname)
+		first_i += 1
+		U, C, E, R, W, obj_val = prev
+		stats['iters'] = first_i
+
+	try:
+		for i in xrange(first_i, max_iters):
+			stats['iters'] = i + 1
+			u_stats, c_stats = {}, {}
+
+			t_bgn = time.time()
+			start = None
+			if i == 0 and init is not None:
+				if mm.get_formulation(formulation)['symmetry'] == 'order': # start must be labeled as the model allows
+					init = _get_canonical_init(init, n)
+				U, start = init[0], init[1:]
+				if U is None:
+					U = gen_U(m, n)
+			elif i == 0:
+				U = gen_U(m, n)
+			else:
+				U = get_U(F, C, n, _get_threads(threads), u_stats, u_models, weights, backend)
+				start = (C, E) # previous iterate is a feasible solution for the new U
+			u_time = time.time() - t_bgn
+
+			cutoff = None
+			if best_obj is not None and best_obj.value < float('inf'):
+				cutoff = best_obj.value
+
+			limit = _get_time_limit(time_limit, deadline, i, max_iters)
+			if limit is not None and limit <= 0: # out of time before get_C could start
+				stats['status'] = 'budget'
+				if prev is None:
+					return None, None, None, None, None, None, BUDGET_MSG
+				return prev + (None,)
+
+			t_bgn = time.time()
+			c_form = _get_iter_formulation(formulation, i)
+			c_model = model if mm.get_formulation(c_form)['symmetry'] == 'none' else None # restricted first model is not kept
+			key = cache.get_key(F, U, Q, G, n, c_max, lamb1, lamb2, weights, c_form) if cache is not None else None
+			sol = cache.get(key) if key is not None else None
+			if sol is not None:
+				obj_val, C, E, R, W, err_msg = _get_cached_C(sol, cutoff, c_stats)
+				stats['cache_hits'] += 1
+			else:
+				obj_val, C, E, R, W, err_msg = get_C(F, U, Q, G, A, H, n, c_max, lamb1, lamb2, limit, cutoff, _get_threads(threads), c_stats, start, model = c_model, formulation = c_form, weights = weights, backend = backend)
+				if key is not None and _is_optimal(c_stats, backend):
+					cache.put(key, (obj_val, C, E, R, W))
+			c_time = time.time() - t_bgn
+
+			if trace_fname is not None:
+				prevC = prev[1] if prev is not None else None
+				write_trace(trace_fname, _get_trace_rec(restart_id, i, u_time, u_stats, c_time, c_stats, cutoff, C, prevC, limit))
+
+			# out of time without a new iterate
+			if err_msg == NO_SOLUTION_MSG and deadline is not None and time.time() >= deadline:
+				stats['status'] = 'budget'
+				if prev is None:
+					return None, None, None, None, None, None, BUDGET_MSG
+				return prev + (None,)
+
+			# time limit of a later iteration ran out before any solution was found
+			if err_msg == NO_SOLUTION_MSG and prev is not None:
+				stats['status'] = 'no_solution'
+				return prev + (None,)
+
+			# abandon restart if it can no longer beat the best restart
+			if err_msg == CUTOFF_MSG:
+				stats['status'] = 'cutoff'
+				if prev is None:
+					return None, None, None, None, None, None, err_msg
+				return prev + (None,)
+
+			# handle errors
+			if err_msg != None:
+				stats['status'] = 'error'
+				return None, None, None, None, None, None, err_msg
+
+			# end restart if another restart already continued from this iterate
+			if explored is not None and explored.setdefault(get_fingerprint(C, E), restart_id) != restart_id:
+				stats['status'] = 'collapsed'
+				return U, C, E, R, W, obj_val, None
+
+			if i > 0:
+				if abs((C - prev[1])).sum() == 0:
+					stats['status'] = 'converged'
+					break
+
+			prev = (U, C, E, R, W, obj_val)
+			if checkpoint_fname is not None:
+				ck.save_iterate(checkpoint_fname, i, *prev)
+
+		return U, C, E, R, W, obj_val, None
+	finally:
+		dispose_U_models(u_models)
+
+
+#  input: lambs (list of tuple) (lamb1 (float), lamb2 (float)) for each grid point
+#         trace_fnames (list of str or None) trace file for each grid point. see get_UCE
+#         all other input is the same as get_UCE
+# output: results (list of tuple) U, C, E, R, W, obj_val, err_msg as returned by get_UCE for each grid point
+#  notes: every grid point starts from the same random U so the first get_C model is built only once
+#           and solved for each grid point. the cordinate descent of each grid point then continues alone
+def get_UCE_sweep(F, Q, G, A, H, n, c_max, lambs, max_iters, time_limit = None, seed = None, threads = None, trace_fnames = None, restart_id = 0, formulation = None, weights = None, backend = 'gurobi', cache = None):
+	np.random.seed(seed)
+	m = len(F)
+	U = gen_U(m, n)
+	sols = get_C_sweep(F, U, Q, G, A, H, n, c_max, lambs, time_limit, _get_threads(threads), formulation = formulation, weights = weights, backend = backend)
 
-	for i in xrange(0, max_iters):
-
-		if i == 0:
-			U = gen_U(m, n)
-		else:
-			U = get_U(F, C, n)
-
-		obj_val, C, E, R, W, err_msg = get_C(F, U, Q, G, A, H, n, c_max, lamb1, lamb2, time_limit)
-
-		# handle errors
+	results = []
+	for g, (lamb1, lamb2) in enumerate(lambs):
+		obj_val, C, E, R, W, err_msg = sols[g]
 		if err_msg != None:
-			return None, None, None, None, None, None, err_msg
-
-		if i > 0:
-			if abs((C - prevC)).sum() == 0:
-				break
-
-		prevC = C
-
-	return U, C, E, R, W, obj_val, None
-
+			results.append((None, None, None, None, None, None, err_msg))
+			continue
+		trace_fname = trace_fnames[g] if trace_fnames is not None else None
+		results.append(get_UCE(F, Q, G, A, H, n, c_max, lamb1, lamb2, max_iters, time_limit, threads = threads, trace_fname = trace_fname, restart_id = restart_id, first_iterate = (U, C, E, R, W, obj_val), formulation = formulation, weights = weights, backend = backend, cache = cache))
+	return results
 
 #  input: F (np.array of float) [m, l+r] mixed copy number f_p,s of mutation s in sample p
 #         C (np.array of int) [2n-1, l+r] int copy number c_k,s of mutation s in clone k
 #         n (int) number of leaves in phylogeny. 2n-1 is total number of nodes
+#         threads (int or None) number of samples solved at the same time. None uses every core
+#         stats (dict or None) if given, filled with timings
+#         models (dict or None) persistent models of a restart. if empty, the models are built and stored
+#           in it with one Gurobi environment per thread. later calls only change the coefficients multiplying
+#           C. needs the same F and n. free them with dispose_U_models. None solves the samples one after
+#           another in the default environment
+#         weights (np.array of int or None) [l+r] number of columns each column of F stands for. see
+#           matrix_model.build
+#         backend (str) one of BACKENDS. 'highs' solves the samples one after another without models
 # output: U (np.array of float) [m, 2n-1] 0 <= u_p,k <= 1. percent of sample p made by clone k
-def get_U(F, C, n):
+#  notes: each row of U only appears in the unmixing error of its own sample, so there is one model per
+#           sample. samples are split into groups that are solved in parallel threads, each with its own
+#           environment
+def get_U(F, C, n, threads = None, stats = None, models = None, weights = None, backend = 'gurobi'):
+	t_bgn = time.time()
 	m, L = F.shape
-	N = 2*n-1
-	mod = gp.Model('tusv')
-	U = _get_gp_arr_cnt_var(mod, m, N, 1.0)
-	for i in xrange(0, m):
-		mod.addConstr(gp.quicksum(U[i, :]) == 1.0)
-	sums = []
-	for p in xrange(0, m):
-		for s in xrange(0, L):
-			f_hat = gp.quicksum([ U[p, k] * C[k, s] for k in xrange(0, N) ])
-			sums.append(_get_abs(mod, F[p, s] - f_hat))
-	
-	mod.setObjective(gp.quicksum(sums), gp.GRB.MINIMIZE)
-	mod.optimize()
-	U = _as_solved(U)
-
-	for i in xrange(m):
-		for j in xrange(2*n-1):
-			if U[i, j] <= U_MIN:
-				U[i, j] = 0.0
-
-	# renormalize U so all rows sum to 1
-	rowsums = np.sum(U, 1)
-	for i in xrange(m):
-		U[i, :] = U[i, :] / rowsums[i]
-
-	return U
+	if backend == 'highs':
+		U = np.array([ hm.solve_U(F[p, :], C, weights) for p in xrange(0, m) ])
+		if stats is not None:
+			stats['build_time'], stats['opt_time'] = 0.0, time.time() - t_bgn
+		return _normalize_U(U)
+	_import_gurobi()
+	if not models:
+		num_groups = max(1, min(m, threads if threads != None else mp.cpu_count())) if models is not None else 1
+		groups = [ [] for _ in xrange(0, num_groups) ]
+		envs = [ gp.Env() for _ in xrange(0, num_groups) ] if models is not None else [ None ] # None is the default env
+		for p in xrange(0, m):
+			mod, I = mm.build_U(F[p, :], C, envs[p % num_groups], weights)
+			mod.params.Threads = 1
+			groups[p % num_groups].append((p, mod, I))
+		if models is not None:
+			models['groups'], models['envs'] = groups, envs
+	else:
+		groups = models['groups']
+		for group in groups:
+			for p, mod, I in group:
+				mm.set_C(mod, I, C)
+
+	t_opt = time.time()
+	pool = ThreadPool(len(groups))
+	try:
+		pool.map(_optimize_U_group, groups)
+	finally:
+		pool.close()
+		pool.join()
+	if stats is not None:
+		stats['build_time'] = t_opt - t_bgn
+		stats['opt_time'] = time.time() - t_opt
+
+	U = np.zeros((m, 2*n-1))
+	for group in groups:
+		for p, mod, I in group:
+			U[p, :] = mm.solved_U(I)
+	if models is None:
+		dispose_U_models({ 'groups': groups })
+	return _normalize_U(U)
+
+# frees the Gurobi models and environments in models (dict) filled by get_U and empties it
+def dispose_U_models(models):
+	for group in models.get('groups', []):
+		for p, mod, I in group:
+			mod.dispose()
+	for env in models.get('envs', []):
+		env.dispose()
+	models.clear()
+
+# returns U (np.array of float) [m, 2n-1] with tiny usages set to 0 and rows renormalized to sum to 1
+def _normalize_U(U):
+	U[U <= U_MIN] = 0.0
+	return U / U.sum(axis = 1, keepdims = True)
+
+def _optimize_U_group(group):
+	for p, mod, I in group:
+		mod.optimize()
 
 #  input: F (np.array of float) [m, l+r] mixed copy number f_p,s of mutation s in sample p
 #         U (np.array of float) [m, 2n-1] 0 <= u_p,k <= 1. percent of sample p made by clone k
@@ -119,6 +328,23 @@ def get_U(F, C, n):
 #         lamb1 (float) regularization term to weight total tree cost against unmixing error
 #         lamb2 (float) regularization term to weight breakpoint frequency error
 #         time_limit (int) maximum number of seconds the solver will run
+#         cutoff (float or None) solutions with objective no better than cutoff are ignored
+#         threads (int or None) number of threads Gurobi may use. None uses Gurobi's default
+#         stats (dict or None) if given, filled with model size, timings and solver statistics
+#         start (tuple or None) C, E (np.array) [2n-1, l+r], [2n-1, 2n-1] given to the solver as a MIP start.
+#           with the 'matrix' builder every auxiliary variable is started too. see matrix_model.get_start
+#         builder (str) one of BUILDERS. 'matrix' builds the model with the gurobipy matrix API. 'loop' adds
+#           one variable and constraint at a time. both build the same model
+#         model (dict or None) persistent model of a restart. if empty, the model is built and stored in it.
+#           later calls only change the coefficients multiplying U instead of building the model again.
+#           needs the 'matrix' builder and the same input other than U, time_limit, cutoff and threads
+#         formulation (dict or None) choices of the model. see matrix_model.build. the 'loop' builder only
+#           builds the default formulation
+#         weights (np.array of int or None) [l+r] number of columns each column of F stands for. see
+#           matrix_model.build. the 'loop' builder counts every column once
+#         backend (str) one of BACKENDS. 'gurobi' solves the model of builder. 'highs' solves the rows of the
+#           'matrix' builder with HiGHS (see highs_model). it keeps no model between calls and ignores
+#           cutoff, threads and start
 # output: obj_val (float) objective value of solution
 #         C (np.array of int) [2n-1, l+r] int copy number c_k,s of mutation s in clone k
 #         E (np.array of int) [2n-1, 2n-1] e_i,j == 1 iff edge (i,j) is in tree. 0 otherwise
@@ -126,7 +352,57 @@ def get_U(F, C, n):
 #         W_all (np.array of int) [2n-1, 2n-1] number of breakpoints appearing along each edge in tree
 #         err_msg (None or str) None if no error occurs. str with error message if one does
 #  notes: l (int) is number of structural variants. r (int) is number of copy number regions
-def get_C(F, U, Q, G, A, H, n, c_max, lamb1, lamb2, time_limit = None):
+def get_C(F, U, Q, G, A, H, n, c_max, lamb1, lamb2, time_limit = None, cutoff = None, threads = None, stats = None, start = None, builder = 'matrix', model = None, formulation = None, weights = None, backend = 'gurobi'):
+	t_bgn = time.time()
+	if backend == 'highs':
+		mod = hm.build_C(F, U, Q, G, _get_expected_bpf(F, Q), n, c_max, formulation, weights)
+		return _solve_C_highs(mod, lamb1, lamb2, t_bgn, time_limit, stats)
+	_import_gurobi()
+	if model:
+		mod, V = model['mod'], model['V']
+		mm.set_U(mod, V, U)
+	else:
+		mod, V = _build_C_model(F, U, Q, G, A, H, n, c_max, builder, formulation, weights)
+		mod.setObjective(_get_objective(V['obj_terms'], lamb1, lamb2), gp.GRB.MINIMIZE)
+		if model is not None and builder == 'matrix':
+			model['mod'], model['V'] = mod, V
+	if start is not None and builder == 'matrix':
+		mm.set_start(mod, V, start[0], start[1], U) # complete start including every auxiliary variable
+	elif start is not None:
+		_set_start(V['C'], start[0])
+		_set_start(V['E'], start[1])
+	sol = _solve_C_model(mod, V, t_bgn, time_limit, cutoff, threads, stats)
+	if start is not None and model: # start only applies to this call
+		mm.set_start(mod, V)
+	return sol
+
+#  input: lambs (list of tuple) (lamb1 (float), lamb2 (float)) for each grid point. all other input is
+#           the same as get_C
+# output: sols (list of tuple) obj_val, C, E, R, W_all, err_msg as returned by get_C for each grid point
+#  notes: the model is only built once. only the objective weights change between grid points
+def get_C_sweep(F, U, Q, G, A, H, n, c_max, lambs, time_limit = None, threads = None, stats = None, formulation = None, weights = None, backend = 'gurobi'):
+	t_bgn = time.time()
+	if backend == 'highs':
+		mod = hm.build_C(F, U, Q, G, _get_expected_bpf(F, Q), n, c_max, formulation, weights)
+		return [ _solve_C_highs(mod, lamb1, lamb2, t_bgn, time_limit, stats) for lamb1, lamb2 in lambs ]
+	_import_gurobi()
+	mod, V = _build_C_model(F, U, Q, G, A, H, n, c_max, formulation = formulation, weights = weights)
+	sols = []
+	for lamb1, lamb2 in lambs:
+		mod.setObjective(_get_objective(V['obj_terms'], lamb1, lamb2), gp.GRB.MINIMIZE)
+		sols.append(_solve_C_model(mod, V, t_bgn, time_limit, None, threads, stats))
+		t_bgn = time.time()
+	return sols
+
+# returns mod (gp.Model) with all constraints of get_C but no objective and V (dict) its variables
+def _build_C_model(F, U, Q, G, A, H, n, c_max, builder = 'matrix', formulation = None, weights = None):
+	_import_gurobi()
+	if builder == 'loop':
+		return _build_C_model_loop(F, U, Q, G, A, H, n, c_max)
+	return mm.build(F, U, Q, G, _get_expected_bpf(F, Q), n, c_max, formulation, weights)
+
+# returns mod and V as _build_C_model does. adds one variable and constraint at a time
+def _build_C_model_loop(F, U, Q, G, A, H, n, c_max):
 	l, r = Q.shape
 	m, _ = U.shape
 	N = 2*n - 1
@@ -142,8 +418,7 @@ def get_C(F, U, Q, G, A, H, n, c_max, lamb1, lamb2, time_limit = None):
 	C_bin = _get_bin_rep(mod, C, c_max)
 	Gam = _get_gp_arr_int_var(mod, N, l, c_max)
 
-	F_seg = F[:, l:].dot(np.transpose(Q)) # [m, l] mixed copy number of segment containing breakpoint
-	Pi = np_divide_0(F[:, :l], F_seg)     # [m, l] expected bpf (ratio of bp copy num to segment copy num)
+	Pi = _get_expected_bpf(F, Q)
 
 	_set_copy_num_constraints(mod, C, n, l, r)
 	_set_tree_constraints(mod, E, n)
@@ -154,18 +429,69 @@ def get_C(F, U, Q, G, A, H, n, c_max, lamb1, lamb2, time_limit = None):
 	_set_segment_copy_num_constraints(mod, Gam, C, Q, W, m, n, l, r)
 	_set_bpf_penalty(mod, S, Pi, U, C, Gam)
 
-	mod.setObjective(_get_objective(mod, F, U, C, R, S, lamb1, lamb2), gp.GRB.MINIMIZE)
-
-	mod.params.MIPFocus = 1
-	if time_limit != None:
-		mod.params.TimeLimit = time_limit
-
+	obj_terms = _get_objective_terms(mod, F, U, C, R, S)
+	return mod, { 'C': C, 'E': E, 'A': A, 'R': R, 'W': W, 'obj_terms': obj_terms }
+
+# returns formulation (dict or None) of the get_C of cordinate descent iteration i. U of the first iteration is
+#   random or relabeled with the start, so no labeling of a tree is preferred before the first solve and
+#   symmetry breaking only changes where the cordinate descent starts. every later U is fit to the labels of
+#   the previous iterate, so the restriction would remove better trees and is dropped
+def _get_iter_formulation(formulation, i):
+	if i == 0 or mm.get_formulation(formulation)['symmetry'] == 'none':
+		return formulation
+	return dict(formulation, symmetry = 'none')
+
+# returns init (tuple) U, C, E relabeled with matrix_model.get_canonical_order. U may be None
+def _get_canonical_init(init, n):
+	U, C, E = init
+	order = mm.get_canonical_order(E, n)
+	return (U[:, order] if U is not None else None), C[order, :], E[np.ix_(order, order)]
+
+# returns obj_val, C, E, R, W_all, err_msg as get_C does for sol (tuple) obj_val, C, E, R, W_all found in a
+#   c_cache.CCache. fills stats (dict) like a solve that needed no time
+def _get_cached_C(sol, cutoff, stats):
+	stats.update({ 'cache_hit': True, 'build_time': 0.0, 'opt_time': 0.0, 'obj_val': sol[0] })
+	if cutoff is not None and sol[0] >= cutoff:
+		return None, None, None, None, None, CUTOFF_MSG
+	return sol + (None,)
+
+# returns True if stats (dict) filled by get_C with backend (str) belong to a solution proven optimal. only
+#   those are cached since a solve cut short by a time limit or cutoff may do better when run again
+def _is_optimal(stats, backend):
+	if backend == 'highs':
+		return stats.get('status') == hm.OPTIMAL
+	return stats.get('status') == _import_gurobi().GRB.OPTIMAL
+
+# solves mod built by highs_model.build_C and returns obj_val, C, E, R, W_all, err_msg as get_C does
+def _solve_C_highs(mod, lamb1, lamb2, t_bgn, time_limit, stats):
+	sol = hm.solve_C(mod, lamb1, lamb2, time_limit, stats, time.time() - t_bgn)
+	return sol + ((NO_SOLUTION_MSG if sol[0] is None else None),)
+
+# optimizes mod built by _build_C_model and returns obj_val, C, E, R, W_all, err_msg as get_C does
+def _solve_C_model(mod, V, t_bgn, time_limit, cutoff, threads, stats):
+	mod.params.MIPFocus = 1 # parameters are all set since a persistent model keeps those of its last solve
+	mod.params.TimeLimit = time_limit if time_limit != None else gp.GRB.INFINITY
+	mod.params.Cutoff = cutoff if cutoff != None else gp.GRB.INFINITY
+	mod.params.Threads = threads if threads != None else 0
+
+	t_opt = time.time()
 	mod.optimize()
-
-	C = _as_solved(C)
-	E = _as_solved(E)
-	R = _as_solved(R)
-	A = _as_solved(A)
+	_set_solve_stats(mod, stats, t_opt - t_bgn, time.time() - t_opt)
+
+	if mod.status == gp.GRB.CUTOFF or (mod.SolCount == 0 and cutoff != None):
+		return None, None, None, None, None, CUTOFF_MSG
+	if mod.SolCount == 0:
+		return None, None, None, None, None, NO_SOLUTION_MSG
+
+	if 'layout' in V: # built by matrix_model
+		C, E, R, W_node = mm.get_solved(V)
+		return mod.objVal, C, E, R, W_node, None
+
+	N, l = V['W'].shape[1], V['W'].shape[2]
+	C = _as_solved(V['C'])
+	E = _as_solved(V['E'])
+	R = _as_solved(V['R'])
+	W = V['W']
 	W_node = np.zeros((N, l), dtype = int)
 	for j in xrange(0, N):
 		for b in xrange(0, l):
@@ -236,9 +562,8 @@ def _set_bp_appearance_constraints(mod, C_bin, W, E, G, n, l):
 		for j in xrange(0, N):
 			for b in xrange(0, l): # set W as bp appearance
 				mod.addConstr(W[i, j, b] == 1 - X_bin[i, j, b])
-			for s in xrange(0, l):
-				for t in xrange(0, l): # breakpoint pairs appear on same edge
-					mod.addConstr(_get_abs(mod, W[i, j, s] - W[i, j, t]) <= 1 - G[s, t])
+			for s, t in zip(*mm.get_mates(G)): # breakpoint pairs appear on same edge
+				mod.addConstr(W[i, j, s] == W[i, j, t])
 	for b in xrange(0, l):     # breakpoints only appear once in the tree
 		mod.addConstr(gp.quicksum([ W[i, j, b] for i in xrange(0, N) for j in xrange(0, N) ]) == 1)
 
@@ -298,23 +623,28 @@ def _set_bpf_penalty(mod, S, Pi, U, C, Gam):
 #   OBJECTIVE
 #
 
-def _get_objective(mod, F, U, C, R, S, lamb1, lamb2): # returns expression for objective
+# returns expressions for unmixing error, tree cost and bpf penalty. objective weights them by 1, lamb1, lamb2
+def _get_objective_terms(mod, F, U, C, R, S):
 	m, L = F.shape
 	N, _ = C.shape
 	_, l = S.shape
-	sums = []
+	errs, costs, bpfs = [], [], []
 	for p in xrange(0, m):
 		for s in xrange(0, L):
 			f_hat = gp.quicksum([ U[p, k] * C[k, s] for k in xrange(0, N) ])
-			sums.append(_get_abs(mod, F[p, s] - f_hat))
+			errs.append(_get_abs(mod, F[p, s] - f_hat))
 	for i in xrange(0, N):
 		for j in xrange(0, N):
-			sums.append(lamb1 * R[i, j])
+			costs.append(R[i, j])
 	for p in xrange(0, m):
 		for b in xrange(0, l):
-			sums.append(lamb2 * S[p, b])
+			bpfs.append(S[p, b])
 	mod.update()
-	return gp.quicksum(sums)
+	return gp.quicksum(errs), gp.quicksum(costs), gp.quicksum(bpfs)
+
+def _get_objective(obj_terms, lamb1, lamb2): # returns expression for objective
+	err, cost, bpf = obj_terms
+	return err + lamb1 * cost + lamb2 * bpf
 
 
 # # # # # # # # # # # # # # # # # # # # # # # #
@@ -614,6 +944,13 @@ def _get_3D_bin_rep(mod, X, vmax):
 	return Y
 
 
+# sets np.array X0 as MIP start of variables X
+def _set_start(X, X0):
+	m, n = X.shape
+	for i in xrange(0, m):
+		for j in xrange(0, n):
+			X[i, j].Start = X0[i, j]
+
 # returns numpy array of solved values
 def _as_solved(X):
 	m, n = X.shape
@@ -667,6 +1004,41 @@ def _get_bp_appearance_var(n, l):
 		W[b] = cvx.Int(N, N)
 	return W
 
+#  input: U (np.array of float) [m, 2n-1] 0 <= u_p,k <= 1. percent of sample p made by clone k
+#         C (np.array of int) [2n-1, l+r] int copy number c_k,s of mutation s in clone k
+#         E (np.array of int) [2n-1, 2n-1] e_i,j == 1 iff edge (i,j) is in tree. 0 otherwise
+#         n (int) number of leaves in phylogeny of U, C, E
+#         k (int) index of leaf to split. 0 <= k < n
+# output: U, C, E (np.array) [m, 2n+1], [2n+1, l+r], [2n+1, 2n+1] same phylogeny with n+1 leaves. leaf k
+#           hangs from new internal node n+1 together with new leaf n. both copy leaf k and have no usage
+#  notes: internal node j of the input becomes node j+2 so the root stays the last node. the output has
+#           the same objective as the input and can be used as init of get_UCE with n+1 leaves
+def split_leaf(U, C, E, n, k):
+	m, L = U.shape[0], C.shape[1]
+	N = 2*n-1
+	indxs = [ j if j < n else j+2 for j in xrange(0, N) ] # new index of each node
+	U_new, C_new, E_new = np.zeros((m, N+2)), np.zeros((N+2, L)), np.zeros((N+2, N+2), dtype = int)
+	U_new[:, indxs] = U
+	C_new[indxs, :] = C
+	E_new[np.ix_(indxs, indxs)] = E
+	p = indxs[int(np.argmax(E[:, k]))] # parent of leaf k
+	E_new[p, k] = 0
+	E_new[p, n+1] = E_new[n+1, k] = E_new[n+1, n] = 1
+	C_new[n, :] = C_new[n+1, :] = C[k, :]
+	return U_new, C_new, E_new
+
+#  input: C (np.array of int) [2n-1, l+r] int copy number c_k,s of mutation s in clone k
+#         E (np.array of int) [2n-1, 2n-1] e_i,j == 1 iff edge (i,j) is in tree. 0 otherwise
+# output: fingerprint (str) hex digest of the tree E with the copy numbers C of each node
+#  notes: nodes are only identified by their copy numbers and subtrees, so trees that only differ in
+#           the labels of their nodes or in the order of children have the same fingerprint. as get_U only
+#           depends on C, cordinate descent continues the same way from iterates with the same fingerprint
+def get_fingerprint(C, E):
+	def get_canonical(k): # nested string of node k and its subtree. children in sorted order
+		children = sorted([ get_canonical(j) for j in np.nonzero(E[k, :])[0] ])
+		return '(' + ','.join([ str(int(round(c))) for c in C[k, :] ]) + ''.join(children) + ')'
+	return hashlib.sha1(get_canonical(len(E) - 1).encode()).hexdigest()
+
 # generate random U matrix with m rows and 2n-1 cols. vals are between 0.0 and 1.0 and rows sum to 1.0
 def gen_U(m, n):
 	U = np.random.rand(m, 2*n-1)
@@ -675,6 +1047,77 @@ def gen_U(m, n):
 		U[i, :] = U[i, :] / rowsums[i]
 	return U
 
+#  input: mod (gp.Model) model that was just optimized
+#         stats (dict or None) dictionary to fill. nothing is done if None
+#         build_time (float) seconds spent building mod
+#         opt_time (float) seconds spent in mod.optimize()
+def _set_solve_stats(mod, stats, build_time, opt_time):
+	if stats is None:
+		return
+	stats['build_time'] = build_time
+	stats['opt_time'] = opt_time
+	stats['status'] = mod.status
+	stats['num_vars'] = mod.NumVars
+	stats['num_constrs'] = mod.NumConstrs
+	stats['sol_count'] = mod.SolCount
+	stats['obj_val'] = mod.objVal if mod.SolCount > 0 else None
+	stats['mip_gap'] = mod.MIPGap if mod.IsMIP and mod.SolCount > 0 else None
+	stats['node_count'] = mod.NodeCount if mod.IsMIP else None
+
+# returns dict recording one cordinate descent iteration of restart_id for the trace written by get_UCE
+def _get_trace_rec(restart_id, i, u_time, u_stats, c_time, c_stats, cutoff, C, prevC, time_limit = None):
+	rec = { 'event': 'iteration', 'restart': restart_id, 'iter': i, 'cutoff': cutoff, 'time_limit': time_limit, 'u_time': u_time, 'c_time': c_time }
+	for k in ['build_time', 'opt_time']:
+		rec['u_' + k] = u_stats.get(k)
+	for k in ['build_time', 'opt_time', 'status', 'num_vars', 'num_constrs', 'obj_val', 'mip_gap', 'node_count']:
+		rec['c_' + k] = c_stats.get(k)
+	rec['c_cache_hit'] = c_stats.get('cache_hit', False)
+	rec['c_changed'] = None
+	if C is not None:
+		rec['c_changed'] = prevC is None or bool(abs(C - prevC).sum() != 0)
+	return rec
+
+#  input: time_limit (int or None) limit of a single get_C call
+#         deadline (float or None) time.time() by which the restart must finish
+#         i (int) index of the next cordinate descent iteration
+#         max_iters (int) maximum number of iterations
+# output: limit (float or None) limit for get_C of iteration i. at most time_limit. <= 0 if deadline passed
+#  notes: iteration j is weighted by 1/(j+1) and gets its weight's share of the time left. early iterations
+#           move C the most, while later ones usually start near a fixed point and converge quickly
+def _get_time_limit(time_limit, deadline, i, max_iters):
+	if deadline is None:
+		return time_limit
+	weights = [ 1.0 / (j+1) for j in xrange(i, max_iters) ]
+	limit = (deadline - time.time()) * weights[0] / sum(weights)
+	if time_limit is not None:
+		limit = min(limit, time_limit)
+	return limit
+
+# appends rec (dict) as one line of json to fname
+def write_trace(fname, rec):
+	rec = dict([ (k, v.item() if isinstance(v, np.generic) else v) for k, v in rec.items() ])
+	line = json.dumps(rec, sort_keys = True) + '\n'
+	with open(fname, 'a') as f:
+		f.write(line) # single write so lines from concurrent restarts do not interleave
+
+# returns Pi (np.array of float) [m, l] expected bpf (ratio of bp copy num to segment copy num)
+def _get_expected_bpf(F, Q):
+	l, _ = Q.shape
+	F_seg = F[:, l:].dot(np.transpose(Q)) # [m, l] mixed copy number of segment containing breakpoint
+	return np_divide_0(F[:, :l], F_seg)
+
+# returns gurobipy and makes it gp of this module. see matrix_model.import_gurobi
+def _import_gurobi():
+	global gp
+	gp = mm.import_gurobi()
+	return gp
+
+# returns number of threads for next Gurobi model. threads is an int, a function returning an int or None
+def _get_threads(threads):
+	if callable(threads):
+		return threads()
+	return threads
+
 def printnow(s):
 	sys.stdout.write(s)
 	sys.stdout.flush()
@@ -1,8 +1,13 @@
-import solver as sv
 import random
 import sys
 import numpy as np
 
+# custom modules
+import solver as sv
+import matrix_model as mm
+import heuristic as hr
+import segments as sg
+
 def printnow(s):
 	sys.stdout.write(s)
 	sys.stdout.flush()
@@ -29,8 +34,13 @@ def main(argv):
 	lamb2 = 1.0
 	lamb2 = 0.25
 
+	test_heuristic_start(F, Q, G, n, c_max)
+	test_merge_segments(F, Q, G, n, c_max, lamb1, lamb2)
+	test_get_fingerprint(F, Q, G, n, c_max)
+	test_split_leaf(F, Q, G, n, c_max, lamb1, lamb2)
 	test_get_U(F, n, l, r)
 	test_get_C(F, Q, G, A, H, n, c_max, lamb1, lamb2)
+	test_builders(F, Q, G, A, H, n, c_max, lamb1, lamb2)
 	test_get_UCE(F, Q, G, A, H, n, c_max, lamb1, lamb2, max_iters = 2)
 
 # mixed copy number
@@ -105,6 +115,107 @@ def test_get_C(F, Q, G, A, H, n, c_max, lamb1, lamb2):
 
 	printnow('test_get_C complete\n')
 
+def test_builders(F, Q, G, A, H, n, c_max, lamb1, lamb2):
+	m = len(F)
+	U = gen_U(m, n)
+	printnow('\ntest_builders starting\n')
+	for builder in sv.BUILDERS:
+		mod, _ = sv._build_C_model(F, U, Q, G, A, H, n, c_max, builder)
+		mod.update()
+		obj_val = sv.get_C(F, U, Q, G, A, H, n, c_max, lamb1, lamb2, 10, builder = builder)[0]
+		printnow(builder + ':\t' + str(mod.NumVars) + ' variables\t' + str(mod.NumConstrs) + ' constraints\t' + str(mod.NumNZs) + ' nonzeros\tobjective value ' + str(obj_val) + '\n')
+	printnow('test_builders complete\n')
+
+# checks that the heuristic start with every choice of the formulation and c_max 1 to c_max satisfies every
+#   row, bound and indicator of the model
+def test_heuristic_start(F, Q, G, n, c_max):
+	m = len(F)
+	U = gen_U(m, n)
+	Pi = sv._get_expected_bpf(F, Q)
+	printnow('\ntest_heuristic_start starting\n')
+	for c in xrange(1, c_max+1):
+		C, E = hr.get_start(F, Q, G, n, c)
+		for part in sorted(mm.CHOICES):
+			for choice in mm.CHOICES[part]:
+				U_s, C_s, E_s = sv._get_canonical_init((U, C, E), n) if choice == 'order' else (U, C, E)
+				V, Rw, Ly, U_rows, _ = mm.build_rows(F, U_s, Q, G, Pi, n, c, { part: choice })
+				x0 = mm.get_start({ 'layout': Ly, 'U_rows': U_rows }, C_s, E_s, U_s)
+				viol = _get_violation(V, Rw, x0)
+				assert viol <= mm.ABS_TOL, 'c_max ' + str(c) + ' ' + part + ' ' + choice + ' violated by ' + str(viol)
+		printnow('c_max ' + str(c) + ':\tfeasible with every formulation\n')
+	printnow('test_heuristic_start complete\n')
+
+# checks that a start of the model of merged segments has the same objective as the start of the full model
+#   from the expanded copy numbers
+def test_merge_segments(F, Q, G, n, c_max, lamb1, lamb2):
+	m = len(F)
+	l, r = Q.shape
+	U = gen_U(m, n)
+	printnow('\ntest_merge_segments starting\n')
+	frees = [ s for s in xrange(0, r) if not Q[:, s].any() ]
+	dups = [ l+s for s in frees[:3] ]
+	F_full = np.hstack([ F, F[:, dups] ]) # repeat segments without breakpoints
+	Q_full = np.hstack([ Q, np.zeros((l, len(dups)), dtype = int) ])
+	F_mrg, Q_mrg, weights, seg_map = sg.merge_segments(F_full, Q_full, 0)
+	assert F_mrg.shape[1] == F.shape[1], 'merged ' + str(F_mrg.shape[1]) + ' columns instead of ' + str(F.shape[1])
+	C, E = hr.get_start(F_mrg, Q_mrg, G, n, c_max)
+	obj_mrg = _get_start_obj(F_mrg, U, Q_mrg, G, n, c_max, lamb1, lamb2, C, E, weights)
+	C_full = sg.expand_copy_nums(C, seg_map, l)
+	assert (sg.merge_copy_nums(C_full, seg_map, l) == C).all(), 'merging the expanded copy numbers changed them'
+	obj_full = _get_start_obj(F_full, U, Q_full, G, n, c_max, lamb1, lamb2, C_full, E)
+	assert abs(obj_mrg - obj_full) <= mm.ABS_TOL, 'merged ' + str(obj_mrg) + ' full ' + str(obj_full)
+	printnow('objective value is ' + str(obj_mrg) + ' merged and ' + str(obj_full) + ' expanded\n')
+	printnow('test_merge_segments complete\n')
+
+# checks that relabeling the nodes of a tree keeps its fingerprint and changing a copy number does not
+def test_get_fingerprint(F, Q, G, n, c_max):
+	N = 2*n-1
+	l, _ = Q.shape
+	C, E = hr.get_start(F, Q, G, n, c_max)
+	printnow('\ntest_get_fingerprint starting\n')
+	fingerprint = sv.get_fingerprint(C, E)
+	for _ in xrange(0, 5):
+		order = list(np.random.permutation(n)) + list(n + np.random.permutation(N-1-n)) + [N-1] # root stays last
+		assert sv.get_fingerprint(C[order, :], E[np.ix_(order, order)]) == fingerprint, 'relabeled ' + str(order)
+	C_new = C.copy()
+	C_new[0, l] += 1
+	assert sv.get_fingerprint(C_new, E) != fingerprint, 'changed copy number has the same fingerprint'
+	printnow('fingerprint is ' + fingerprint + '\n')
+	printnow('test_get_fingerprint complete\n')
+
+# checks that splitting any leaf of a start keeps its objective in the model with one more leaf
+def test_split_leaf(F, Q, G, n, c_max, lamb1, lamb2):
+	m = len(F)
+	U = gen_U(m, n)
+	C, E = hr.get_start(F, Q, G, n, c_max)
+	printnow('\ntest_split_leaf starting\n')
+	obj_val = _get_start_obj(F, U, Q, G, n, c_max, lamb1, lamb2, C, E)
+	for k in xrange(0, n):
+		U_new, C_new, E_new = sv.split_leaf(U, C, E, n, k)
+		obj_new = _get_start_obj(F, U_new, Q, G, n+1, c_max, lamb1, lamb2, C_new, E_new)
+		assert abs(obj_new - obj_val) <= mm.ABS_TOL, 'leaf ' + str(k) + ' split ' + str(obj_new) + ' before ' + str(obj_val)
+	printnow('objective value is ' + str(obj_val) + ' before and after splitting every leaf\n')
+	printnow('test_split_leaf complete\n')
+
+# returns obj_val (float) of the start of get_C from C and E with U. the arguments are those of get_C
+def _get_start_obj(F, U, Q, G, n, c_max, lamb1, lamb2, C, E, weights = None):
+	V, Rw, Ly, U_rows, objs = mm.build_rows(F, U, Q, G, sv._get_expected_bpf(F, Q), n, c_max, None, weights)
+	x0 = mm.get_start({ 'layout': Ly, 'U_rows': U_rows }, C, E, U)
+	return sv._get_objective([ (coefs * mm._get_vals(x0, Y, Ly['consts'])).sum() for Y, coefs in objs ], lamb1, lamb2)
+
+# returns largest violation (float) of a row, bound or indicator of V (mm.Vars) and Rw (mm.Rows) by x0 (np.array)
+def _get_violation(V, Rw, x0):
+	M, senses, rhs = Rw.get_matrix()
+	ax = M.dot(x0)
+	viols = [ np.where(senses == mm.EQ, np.abs(ax - rhs), np.where(senses == mm.LE, ax - rhs, rhs - ax)) ]
+	lb, ub, vtypes = V.get_bounds()
+	ub = np.where(vtypes == mm.BIN, np.minimum(ub, 1.0), ub)
+	viols += [ lb - x0, x0 - ub, np.abs(x0 - np.rint(x0)) * (vtypes != mm.CNT) ]
+	for y, val, i, sense, b in Rw.indicators:
+		if round(x0[y]) == val:
+			viols.append([ abs(x0[i] - b) if sense == mm.EQ else (x0[i] - b if sense == mm.LE else b - x0[i]) ])
+	return max([ np.max(v) for v in viols if len(v) ] + [0.0])
+
 def _print_results(err_msg, U, C, E, R, W, obj_val):
 	if err_msg != None:
 		printnow(err_msg + '\n')
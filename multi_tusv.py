@@ -1,7 +1,7 @@
 #     file: multi_tusv.py
 #   author: Jesse Eaton
 #  created: 12/3/2017
-# modified: 12/3/2017
+# modified: 10/18/2026
 #  purpose: Runs unmixing mixed copy numbers for breakpoints and segments and infers phylogeny
 #             with phylogenetic constraints across multiple patients
 
@@ -40,12 +40,15 @@ def main(argv):
 		sub_out_dir = out_dir + subdir_name
 		pt.printnow(''.join([ '\n' for _ in xrange(0, 10) ]))
 		pt.printnow(' '.join([ '=' for _ in xrange(0, 30) ]))
-		msg = 'Running: ' + subdir_name if not os.listdir(sub_out_dir) else 'ALREADY RAN: ' + subdir_name
+		msg = 'Running: ' + subdir_name if not tusv.has_output(sub_out_dir) else 'ALREADY RAN: ' + subdir_name
 		pt.printnow('\t' + msg)
 		pt.printnow(' '.join([ '=' for _ in xrange(0, 30) ]))
 
-		if not os.listdir(sub_out_dir): # directory is empty
-			tusv.unmix(sub_in_dir, sub_out_dir, args['num_leaves'], args['c_max'], args['lambda1'], args['lambda2'], args['restart_iters'], args['cord_desc_iters'], args['processors'], args['time_limit'], args['metadata_file'], args['num_subsamples'], args['overide_lambdas'])
+		if not tusv.has_output(sub_out_dir): # directory is empty
+			opts = tusv.get_unmix_opts(args)
+			if opts['warm_start'] is not None: # previous run of the same patient
+				opts['warm_start'] += subdir_name
+			tusv.unmix(sub_in_dir, sub_out_dir, args['num_leaves'], args['c_max'], args['lambda1'], args['lambda2'], args['restart_iters'], args['cord_desc_iters'], args['processors'], args['time_limit'], args['metadata_file'], args['num_subsamples'], args['overide_lambdas'], **opts)
 
 # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
 #   C O M M A N D   L I N E   A R G U M E N T   F U N C T I O N S   #
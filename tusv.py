@@ -1,7 +1,7 @@
 #     file: tusv.py
 #   author: Jesse Eaton
 #  created: 10/13/2017
-# modified: 10/14/2017
+# modified: 10/18/2026
 #  purpose: Unmixes mixed copy numbers for breakpoints and segments and infers phylogeny
 #             with various phylogenetic constraints
 
@@ -12,8 +12,11 @@
 
 import sys      # for command line arguments
 import os       # for manipulating files and folders
+import re       # for reading the edges of a previous T.dot
 import argparse # for command line arguments
 import random
+import time
+import itertools
 import numpy as np
 import multiprocessing as mp
 
@@ -27,6 +30,11 @@ from cStringIO import StringIO # for converting string to file (for creating ini
 sys.path.insert(0, 'model/')
 sys.path.insert(0, 'help/')
 import solver as sv
+import matrix_model as mm      # builds the copy number model of the solver
+import restarts as rs          # runs random restarts of the cordinate descent in parallel
+import c_cache as cc           # reuses solutions of the copy number step
+import heuristic as hr         # builds a starting tree and copy numbers without a solver
+import segments as sg          # merges segments without breakpoints
 import file_manager as fm      # sanitizes file and directory arguments
 import generate_matrices as gm # gets F, Q, G, A, H from .vcf files
 import printer as pt
@@ -41,8 +49,14 @@ MAX_NUM_LEAVES = 10
 MAX_COPY_NUM = 20
 MAX_CORD_DESC_ITERS = 1000
 MAX_RESTART_ITERS = 1000
+MAX_CACHE_SIZE = 100000
 NUM_CORES = mp.cpu_count()
 METADATA_FNAME = 'data/2017_09_18_metadata.vcf'
+CHECKPOINT_DNAME = 'checkpoint/'
+CACHE_DNAME = 'c_cache/'
+TRACE_FNAME = 'trace.jsonl'
+SWEEP_FNAME = 'sweep.tsv'
+N_SWEEP_FNAME = 'n_sweep.tsv'
 STR_DTYPE = 'S50'
 
 
@@ -53,46 +67,201 @@ STR_DTYPE = 'S50'
 def main(argv):
 	args = get_args(argv)
 	write_readme(args['output_directory'], args)
-	unmix(args['input_directory'], args['output_directory'], args['num_leaves'], args['c_max'], args['lambda1'], args['lambda2'], args['restart_iters'], args['cord_desc_iters'], args['processors'], args['time_limit'], args['metadata_file'], args['num_subsamples'], args['overide_lambdas'])
+	unmix(args['input_directory'], args['output_directory'], args['num_leaves'], args['c_max'], args['lambda1'], args['lambda2'], args['restart_iters'], args['cord_desc_iters'], args['processors'], args['time_limit'], args['metadata_file'], args['num_subsamples'], args['overide_lambdas'], **get_unmix_opts(args))
+
+# returns optional keyword arguments for unmix from parsed command line arguments
+def get_unmix_opts(args):
+	return {
+		'seed': args['seed'],
+		'race': args['race'],
+		'checkpoint': args['checkpoint'] or args['resume'] or args['checkpoint_iters'],
+		'resume': args['resume'],
+		'checkpoint_iters': args['checkpoint_iters'],
+		'threads_per_solve': args['threads_per_solve'],
+		'plateau_window': args['plateau_window'],
+		'plateau_tol': args['plateau_tol'],
+		'plateau_prob': args['plateau_prob'],
+		'sweep_lambda1': args['sweep_lambda1'],
+		'sweep_lambda2': args['sweep_lambda2'],
+		'sweep_n': args['sweep_n'],
+		'time_budget': args['time_budget'],
+		'collapse': args['collapse'],
+		'warm_start': args['warm_start'],
+		'merge_tol': args['merge_segments'],
+		'backend': args['backend'],
+		'cache_size': args['cache_size'],
+		'cache_tol': args['cache_tol'],
+		'cache_disk': args['cache_disk'],
+		'heuristic_start': args['heuristic_start'],
+		'formulation': { 'ancestry': args['ancestry'], 'ordering': args['ordering'], 'binarization': args['binarization'], 'symmetry': args['symmetry'] },
+	}
+
+# returns True if out_dir has output other than the checkpoints, cached solutions and trace of an unfinished run
+def has_output(out_dir):
+	return any([ fname + '/' not in [CHECKPOINT_DNAME, CACHE_DNAME] and fname != TRACE_FNAME for fname in os.listdir(out_dir) ])
 
 #  input: num_seg_subsamples (int or None) number of segments to include in deconvolution. these are
 #           in addition to any segments contining an SV as thos are manditory for the SV. None is all segments
-def unmix(in_dir, out_dir, n, c_max, lamb1, lamb2, num_restarts, num_cd_iters, num_processors, time_limit, metadata_fname, num_seg_subsamples, should_overide_lambdas):
+#         seed (int or None) base seed for random restarts. restart i uses seed + i. None picks one at random
+#         race (bool) abandon restarts once they cannot beat the best objective of a finished restart
+#         checkpoint (bool) save each finished restart to CHECKPOINT_DNAME in out_dir
+#         resume (bool) load restarts saved by a previous pre-empted run instead of running them again
+#         checkpoint_iters (bool) also save each cordinate descent iterate so unfinished restarts resume
+#         threads_per_solve (int or None) Gurobi threads per model. None splits num_processors between
+#           concurrent restarts and their Gurobi threads automatically, or leaves the number of threads to
+#           Gurobi if num_processors is None
+#         plateau_window (int or None) stop launching restarts once the best objective has not improved in
+#           this many restarts. num_restarts becomes an upper bound. None always runs num_restarts
+#         plateau_tol (float) relative improvement of the best objective that resets plateau_window
+#         plateau_prob (float or None) also stop once the estimated probability that another restart
+#           reaches an unseen local optimum falls below this. needs plateau_window
+#         sweep_lambda1, sweep_lambda2 (list of float or None) grid of lambda values. if either is given every
+#           (lambda1, lambda2) pair is solved and written to its own subdirectory of out_dir. None for one
+#           of them uses only lamb1 or lamb2
+#         sweep_n (int or None) solve every number of leaves from n to sweep_n and write each to its own
+#           subdirectory of out_dir. restarts for each number of leaves start from the best solution with
+#           one leaf less by splitting one of its leaves
+#         time_budget (float or None) seconds the whole run may take. the time is spread over the random
+#           restarts and their iterations and the best solution found when it runs out is written
+#         collapse (bool) end a restart once its tree and copy numbers were already visited by another restart
+#         warm_start (str or None) output directory of a previous run on the same input with the same n. its
+#           C.tsv and T.dot are the MIP start of the first get_C of every restart. see get_warm_start
+#         formulation (dict or None) choices of the copy number model. see matrix_model.build
+#         merge_tol (float or None) merge segments without breakpoints with the same mixed copy numbers up to
+#           this tolerance before unmixing. see segments.merge_segments. None does not merge
+#         backend (str) one of solver.BACKENDS solving the copy number and mixture models
+#         cache_size (int) number of copy number solutions each process keeps in memory so iterations and
+#           restarts reaching the same U skip the copy number step. 0 keeps none. see c_cache.CCache
+#         cache_tol (float) U closer than about this share a cached solution. 0 only reuses identical U
+#         cache_disk (bool) also save cached solutions to CACHE_DNAME in out_dir, shared by all processes
+#           and by later runs in out_dir
+#         heuristic_start (bool) start the first get_C of every restart from the tree and copy numbers of
+#           heuristic.get_start. restarts still begin from a random U. not used with warm_start or a lambda sweep
+def unmix(in_dir, out_dir, n, c_max, lamb1, lamb2, num_restarts, num_cd_iters, num_processors, time_limit, metadata_fname, num_seg_subsamples, should_overide_lambdas, seed = None, race = False, checkpoint = False, resume = False, checkpoint_iters = False, threads_per_solve = None, plateau_window = None, plateau_tol = 1e-4, plateau_prob = None, sweep_lambda1 = None, sweep_lambda2 = None, sweep_n = None, time_budget = None, collapse = False, warm_start = None, formulation = None, merge_tol = None, backend = 'gurobi', cache_size = 0, cache_tol = 0.0, cache_disk = False, heuristic_start = False):
+	deadline = time.time() + time_budget if time_budget is not None else None
+	if seed is not None: # also makes the random choice of subsampled segments reproducible
+		random.seed(seed)
+		np.random.seed(seed)
 
 	F_full, Q, G, A, H, bp_attr, cv_attr = gm.get_mats(in_dir)
 	check_valid_input(Q, G, A, H)
 
 	F, Q, org_indxs = randomly_remove_segments(F_full, Q, num_seg_subsamples)
-
-	# replace lambda1 and lambda2 with input derived values if should_orveride_lamdas was specified
+	F_mrg, Q_mrg, weights, seg_map = sg.merge_segments(F, Q, merge_tol) if merge_tol is not None else (F, Q, None, None)
+	cache = None
+	if cache_size > 0 or cache_disk:
+		cache = cc.CCache(cache_size, out_dir + CACHE_DNAME if cache_disk else None, cache_tol)
+
+	inits = None
+	if warm_start is not None:
+		raiseif(sweep_n is not None or sweep_lambda1 is not None or sweep_lambda2 is not None, 'A warm start cannot be used when sweeping the number of leaves or lambdas.')
+		C, E = get_warm_start(warm_start, n, Q.shape[0], org_indxs)
+		inits = [ (None, sg.merge_copy_nums(C, seg_map, Q.shape[0]), E) for _ in xrange(0, num_restarts) ]
+	elif heuristic_start:
+		inits = get_heuristic_inits(F_mrg, Q_mrg, G, n, c_max, num_restarts)
+
+	if sweep_n is not None:
+		raiseif(sweep_lambda1 is not None or sweep_lambda2 is not None, 'The number of leaves and lambdas cannot be swept at the same time.')
+		fname = out_dir + N_SWEEP_FNAME
+		open(fname, 'w').close()
+		fm.append_to_file(fname, '\t'.join(['n', 'lambda1', 'lambda2', 'obj_val', 'directory']) + '\n')
+		best = None # best solution of previous number of leaves
+		for k in xrange(n, sweep_n + 1):
+			dname = out_dir + 'n_' + str(k) + '/'
+			fm.mkdir(dname)
+			l1, l2 = get_lambdas(F, Q, k, lamb1, lamb2, should_overide_lambdas)
+			inits = rs.get_split_inits(best, k-1, num_restarts) if best is not None else inits
+			k_deadline = time.time() + (deadline - time.time()) / (sweep_n - k + 1) if deadline is not None else None # budget split evenly between remaining n
+			results = run_restarts(dname, F_mrg, Q_mrg, G, A, H, k, c_max, l1, l2, num_restarts, num_cd_iters, num_processors, time_limit, seed, race, checkpoint, resume,
+			                       checkpoint_iters, threads_per_solve, plateau_window, plateau_tol, plateau_prob, inits, k_deadline, collapse, formulation, weights, backend, cache)
+			obj_val = write_best(dname, results, F, F_full, org_indxs, G, bp_attr, cv_attr, metadata_fname, seg_map)
+			best = results[rs.get_best(results)]
+			fm.append_to_file(fname, '\t'.join([ str(k), str(l1), str(l2), str(obj_val), os.path.basename(os.path.normpath(dname)) ]) + '\n')
+		return
+
+	lamb1, lamb2 = get_lambdas(F, Q, n, lamb1, lamb2, should_overide_lambdas)
+
+	if sweep_lambda1 is not None or sweep_lambda2 is not None:
+		raiseif(deadline is not None, 'A time budget cannot be used when sweeping lambdas.')
+		lambs = list(itertools.product(sweep_lambda1 or [lamb1], sweep_lambda2 or [lamb2]))
+		dnames = [ out_dir + 'lambda1_' + str(l1) + '_lambda2_' + str(l2) + '/' for l1, l2 in lambs ]
+		for dname in dnames:
+			fm.mkdir(dname)
+		args = (F_mrg, Q_mrg, G, A, H, n, c_max, lambs, num_cd_iters, time_limit)
+		results = rs.run_sweep(args, num_restarts, num_processors, seed = seed, threads_per_solve = threads_per_solve, trace_fnames = [ dname + TRACE_FNAME for dname in dnames ],
+		                       formulation = formulation, weights = weights, backend = backend, cache = cache)
+		fname = out_dir + SWEEP_FNAME
+		open(fname, 'w').close()
+		fm.append_to_file(fname, '\t'.join(['lambda1', 'lambda2', 'obj_val', 'directory']) + '\n')
+		for g, (l1, l2) in enumerate(lambs):
+			obj_val = write_best(dnames[g], results[g], F, F_full, org_indxs, G, bp_attr, cv_attr, metadata_fname, seg_map)
+			fm.append_to_file(fname, '\t'.join([ str(l1), str(l2), str(obj_val), os.path.basename(os.path.normpath(dnames[g])) ]) + '\n')
+		return
+
+	results = run_restarts(out_dir, F_mrg, Q_mrg, G, A, H, n, c_max, lamb1, lamb2, num_restarts, num_cd_iters, num_processors, time_limit, seed, race, checkpoint, resume,
+	                       checkpoint_iters, threads_per_solve, plateau_window, plateau_tol, plateau_prob, inits, deadline, collapse, formulation, weights, backend, cache)
+	write_best(out_dir, results, F, F_full, org_indxs, G, bp_attr, cv_attr, metadata_fname, seg_map)
+
+#  input: dname (str) output directory of a previous run with C.tsv and T.dot (see write_to_files)
+#         n (int) number of leaves. the previous run must have used the same number
+#         l (int) number of breakpoints
+#         org_indxs (list of int or None) column of C.tsv of each segment kept by randomly_remove_segments
+# output: C (np.array of int) [2n-1, l+r] copy numbers of the previous run for the segments that are kept
+#         E (np.array of int) [2n-1, 2n-1] tree of the previous run
+#  notes: segments the previous run did not keep are written as -1. they start at copy number 2
+def get_warm_start(dname, n, l, org_indxs):
+	N = 2*n - 1
+	C = np.loadtxt(os.path.join(dname, 'C.tsv'), delimiter = '\t', ndmin = 2)
+	if org_indxs is not None:
+		C = C[:, range(0, l) + org_indxs]
+	C[C < 0] = 2
+	E = np.zeros((N, N), dtype = int)
+	for i, j in re.findall(r'(\d+) -> (\d+)', open(os.path.join(dname, 'T.dot')).read()):
+		raiseif(max(int(i), int(j)) >= N, 'The tree of the warm start in ' + dname + ' has more than ' + str(N) + ' nodes.')
+		E[int(i), int(j)] = 1
+	raiseif(C.shape[0] != N, 'The copy numbers of the warm start in ' + dname + ' are not for ' + str(N) + ' nodes.')
+	return np.rint(C).astype(int), E
+
+# returns inits (list of tuple) init for each of num_restarts restarts (see restarts.run_restarts) with the tree
+#   and copy numbers of heuristic.get_start for F, Q, G (np.array) and a random U
+def get_heuristic_inits(F, Q, G, n, c_max, num_restarts):
+	C, E = hr.get_start(F, Q, G, n, c_max)
+	return [ (None, C, E) for _ in xrange(0, num_restarts) ]
+
+# returns lamb1 and lamb2 replaced with input derived values if should_overide_lambdas was specified
+def get_lambdas(F, Q, n, lamb1, lamb2, should_overide_lambdas):
 	if should_overide_lambdas:
 		m = len(F)
 		l, r = Q.shape
 		lamb1 = float(l + r) / float(r) * float(m) / float(2 * (n-1) )
 		lamb2 = float(l + r) / float(l)
-
-	Us, Cs, Es, obj_vals, Rs, Ws = [], [], [], [], [], []
-	num_complete = 0
-	for i in xrange(0, num_restarts):
-		U, C, E, R, W, obj_val, err_msg = sv.get_UCE(F, Q, G, A, H, n, c_max, lamb1, lamb2, num_cd_iters, time_limit)
-		printnow(str(i + 1) + ' of ' + str(num_restarts) + ' random restarts complete\n')
-		Us.append(U)
-		Cs.append(C)
-		Es.append(E)
-		Rs.append(R)
-		Ws.append(W)
-		obj_vals.append(obj_val)
-
-	best_i = 0
-	best_obj_val = obj_vals[best_i]
-	for i, obj_val in enumerate(obj_vals):
-		if obj_val < best_obj_val:
-			best_obj_val = obj_val
-			best_i = i
-
-	writer = build_vcf_writer(F_full, Cs[best_i], org_indxs, G, bp_attr, cv_attr, metadata_fname)
-
-	write_to_files(out_dir, Us[best_i], Cs[best_i], Es[best_i], Rs[best_i], Ws[best_i], F, obj_vals[best_i], F_full, org_indxs, writer)
+	return lamb1, lamb2
+
+# runs the random restarts of one number of leaves n with checkpoints and trace in out_dir. see unmix
+def run_restarts(out_dir, F, Q, G, A, H, n, c_max, lamb1, lamb2, num_restarts, num_cd_iters, num_processors, time_limit, seed, race, checkpoint, resume,
+                 checkpoint_iters, threads_per_solve, plateau_window, plateau_tol, plateau_prob, inits = None, deadline = None, collapse = False, formulation = None, weights = None, backend = 'gurobi', cache = None):
+	args = (F, Q, G, A, H, n, c_max, lamb1, lamb2, num_cd_iters, time_limit)
+	checkpoint_dname = out_dir + CHECKPOINT_DNAME if checkpoint else None
+	stop = rs.PlateauStop(plateau_window, plateau_tol, plateau_prob) if plateau_window is not None else None
+	budget = rs.Budget(deadline) if deadline is not None else None
+	results, _ = rs.run_restarts(args, num_restarts, num_processors, seed = seed, race = race, checkpoint_dname = checkpoint_dname, resume = resume,
+	                             checkpoint_iters = checkpoint_iters, threads_per_solve = threads_per_solve, trace_fname = out_dir + TRACE_FNAME, stop = stop, inits = inits, budget = budget,
+	                             collapse = collapse, formulation = formulation, weights = weights, backend = backend, cache = cache)
+	return results
+
+# writes output files for the restart in results with the best objective to out_dir and returns its objective.
+#   copy numbers of merged segments are given to every segment in them with seg_map (see segments.merge_segments)
+def write_best(out_dir, results, F, F_full, org_indxs, G, bp_attr, cv_attr, metadata_fname, seg_map = None):
+	best_i = rs.get_best(results)
+	raiseif(best_i is None, 'Every random restart failed. First error:\n' + str(results[0][6]))
+	U, C, E, R, W, obj_val, _ = results[best_i]
+	if seg_map is not None:
+		C = sg.expand_copy_nums(C, seg_map, len(G))
+
+	writer = build_vcf_writer(F_full, C, org_indxs, G, bp_attr, cv_attr, metadata_fname)
+
+	write_to_files(out_dir, U, C, E, R, W, F, obj_val, F_full, org_indxs, writer)
+	return obj_val
 
 # creates a readme file with the command in it. 
 def write_readme(dname, args, script_name = os.path.basename(__file__)):
@@ -156,9 +325,6 @@ def random_subset(lst, k):
 				result[s] = item
 	return result
 
-def setup_get_UCE(args):
-	return sv.get_UCE(*args)
-
 def printnow(s):
 	sys.stdout.write(s)
 	sys.stdout.flush()
@@ -342,12 +508,37 @@ def set_non_dir_args(parser):
 	parser.add_argument('-l', '--lambda1', default = 0.25, type = lambda x: fm.valid_float_above(parser, x, 0.0), help = 'regularization term to weight total tree cost against unmixing error in objective function. setting as 0.0 will put no tree cost constraint. setting as 1.0 will equally consider tree cost and unmixing error.')
 	parser.add_argument('-a', '--lambda2', default = 6.25, type = lambda x: fm.valid_float_above(parser, x, 0.0), help = 'regularization term to weight error in inferred ratio between copy number of a breakpoint and the copy number of the segment originally containing the position of breakpoint')
 	parser.add_argument('-t', '--cord_desc_iters', required = True, type = lambda x: fm.valid_int_in_range(parser, x, 1, MAX_CORD_DESC_ITERS), help = 'maximum number of cordinate descent iterations for each initialization of U')
-	parser.add_argument('-r', '--restart_iters', required = True, type = lambda x: fm.valid_int_in_range(parser, x, 1, MAX_RESTART_ITERS), help = 'number of random initializations for picking usage matrix U')
-	parser.add_argument('-p', '--processors', default = 1, type = lambda x: fm.valid_int_in_range(parser, x, 1, NUM_CORES), help = 'number of processors to use')
+	parser.add_argument('-r', '--restart_iters', required = True, type = lambda x: fm.valid_int_in_range(parser, x, 1, MAX_RESTART_ITERS), help = 'number of random initializations for picking usage matrix U. upper bound if --plateau_window is given')
+	parser.add_argument('--plateau_window', default = None, type = lambda x: fm.valid_int_in_range(parser, x, 1, MAX_RESTART_ITERS), help = 'stop launching random restarts once the best objective has not improved in this many restarts')
+	parser.add_argument('--plateau_tol', default = 1e-4, type = lambda x: fm.valid_float_above(parser, x, 0.0), help = 'relative improvement of the best objective needed to reset --plateau_window. objectives this close are treated as the same local optimum')
+	parser.add_argument('--plateau_prob', default = None, type = lambda x: fm.valid_float_above(parser, x, 0.0), help = 'with --plateau_window, also stop once the estimated probability that another restart reaches an unseen local optimum falls below this value')
+	parser.add_argument('-p', '--processors', default = None, type = lambda x: fm.valid_int_in_range(parser, x, 1, NUM_CORES), help = 'number of processors to use. this core budget is split between random restarts run in parallel and the Gurobi threads of each restart. default runs one restart at a time and lets Gurobi choose its number of threads')
+	parser.add_argument('--threads_per_solve', default = None, type = lambda x: fm.valid_int_in_range(parser, x, 1, NUM_CORES), help = 'fixed number of Gurobi threads for each model. the number of concurrent restarts becomes processors / threads_per_solve. default runs as many restarts at once as possible and gives cores of finished restarts to the ones still running')
 	parser.add_argument('-m', '--time_limit', type = int, help = 'maximum time (in seconds) allowed for a single iteration of the cordinate descent algorithm')
 	parser.add_argument('-s', '--num_subsamples', type = int, default = None, help = 'number of segments (in addition to those containing breakpoints) that are to be randomly kept for deconvolution. default keeps all segments.')
 	parser.add_argument('-d', '--metadata_file', default = METADATA_FNAME, type = lambda x: fm.is_valid_file(parser, x), help = 'file containing metadata information for output .vcf file')
 	parser.add_argument('-b', '--overide_lambdas', action = 'store_true', help = 'specify this argument if you would like the parameters lambda1 and lambda2 to be set proportional to the input data set')
+	parser.add_argument('--seed', type = int, default = None, help = 'base seed for random restarts. restart i is seeded with seed + i so runs can be reproduced. default picks a random base seed')
+	parser.add_argument('--sweep_lambda1', nargs = '+', default = None, type = lambda x: fm.valid_float_above(parser, x, 0.0), help = 'grid of lambda1 values. every pair with --sweep_lambda2 (or -a if not given) is solved, reusing the first get_C model of each restart, and written to its own subdirectory')
+	parser.add_argument('--sweep_lambda2', nargs = '+', default = None, type = lambda x: fm.valid_float_above(parser, x, 0.0), help = 'grid of lambda2 values. see --sweep_lambda1')
+	parser.add_argument('--time_budget', default = None, type = lambda x: fm.valid_float_above(parser, x, 0.0), help = 'maximum time (in seconds) for the whole run. the time is spread over the random restarts and cordinate descent iterations and the best solution found so far is written when it runs out')
+	parser.add_argument('--sweep_n', default = None, type = lambda x: fm.valid_int_in_range(parser, x, 2, MAX_NUM_LEAVES), help = 'solve every number of leaves from -n up to this value. each number of leaves is written to its own subdirectory and starts from the best tree with one leaf less')
+	parser.add_argument('--race', action = 'store_true', help = 'share the best objective of finished restarts with running restarts. a restart is abandoned once its cordinate descent cannot beat it')
+	parser.add_argument('--collapse', action = 'store_true', help = 'end a restart once it reaches a tree and copy numbers another restart already visited, ignoring node labels. the number of collapsed restarts is reported')
+	parser.add_argument('--backend', default = sv.BACKENDS[0], choices = sv.BACKENDS, help = 'solver of the copy number and mixture models. gurobi needs a license. highs is open source and solves the same formulation. it has no warm starts, racing cutoffs or thread control')
+	parser.add_argument('--cache_size', default = 0, type = lambda x: fm.valid_int_in_range(parser, x, 0, MAX_CACHE_SIZE), help = 'number of copy number solutions each process remembers. a cordinate descent iteration or random restart reaching a mixture already solved reuses its solution instead of solving the copy number model again. default remembers none')
+	parser.add_argument('--cache_tol', default = 0.0, type = lambda x: fm.valid_float_above(parser, x, 0.0), help = 'mixtures closer than about this value share a cached copy number solution. default only reuses solutions of identical mixtures')
+	parser.add_argument('--cache_disk', action = 'store_true', help = 'also save cached copy number solutions to a c_cache/ directory inside the output directory where every random restart and later runs on the same output directory find them')
+	parser.add_argument('--ancestry', default = mm.FORMULATION['ancestry'], choices = mm.ANCESTRY, help = 'encoding of the ancestry relation in the copy number model. triples adds two rows for every triple of nodes. flow routes a unit of flow from the root to every node and needs far fewer rows')
+	parser.add_argument('--ordering', default = mm.FORMULATION['ordering'], choices = mm.ORDERING, help = 'encoding of the breakpoint order condition in the copy number model. blocks adds an l x l block for every pair of nodes. precedence adds one binary for every pair of breakpoints and is needed for many breakpoints')
+	parser.add_argument('--binarization', default = mm.FORMULATION['binarization'], choices = mm.BINARIZATION, help = 'how the copy number model flags nonzero integers. bits writes each integer in binary. bigm and indicator use a single binary per integer')
+	parser.add_argument('--symmetry', default = mm.FORMULATION['symmetry'], choices = mm.SYMMETRY, help = 'symmetry breaking of the node labels in the copy number model. order only allows internal nodes numbered down from the root and leaves sorted by their parent in the first copy number step of each restart, whose mixture is random')
+	parser.add_argument('--merge_segments', nargs = '?', const = 0.0, default = None, type = lambda x: fm.valid_float_above(parser, x, 0.0), help = 'merge segments without breakpoints that have the same mixed copy number in every sample into one weighted segment before unmixing. an optional tolerance also merges segments whose mixed copy numbers round to the same multiple of it. copy numbers are written for every segment')
+	parser.add_argument('--warm_start', default = None, type = lambda x: fm.valid_dir(parser, x), help = 'output directory of a previous run on the same input with the same number of leaves. its C.tsv and T.dot are the starting solution of the first copy number step of every random restart')
+	parser.add_argument('--heuristic_start', action = 'store_true', help = 'start the first copy number step of every random restart from a tree and copy numbers built from the mixed copy numbers by clustering the samples and joining the closest clusters. restarts still begin from a random mixture')
+	parser.add_argument('--checkpoint', action = 'store_true', help = 'save each finished random restart to a checkpoint/ directory inside the output directory')
+	parser.add_argument('--checkpoint_iters', action = 'store_true', help = 'also save each cordinate descent iterate so a pre-empted restart continues where it stopped. implies --checkpoint')
+	parser.add_argument('--resume', action = 'store_true', help = 'resume a pre-empted run from the checkpoint/ directory inside the output directory. restarts already saved are not run again. implies --checkpoint')
 
 # # # # # # # # # # # # # # # # # # # # # # # # #
 #   C A L L   T O   M A I N   F U N C T I O N   #